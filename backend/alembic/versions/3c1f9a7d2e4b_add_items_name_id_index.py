@@ -0,0 +1,25 @@
+"""add items name id index
+
+Revision ID: 3c1f9a7d2e4b
+Revises: 741826062f9e
+Create Date: 2026-10-16 09:12:41.208113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c1f9a7d2e4b'
+down_revision = '741826062f9e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Composite index backing keyset pagination on (name, id)
+    op.create_index('ix_items_name_id', 'items', ['name', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_items_name_id', table_name='items')
@@ -0,0 +1,48 @@
+"""add category closure table
+
+Revision ID: 4a8e6f1c0b37
+Revises: c7d05e3b91f2
+Create Date: 2026-10-16 13:05:48.119264
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4a8e6f1c0b37'
+down_revision = 'c7d05e3b91f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'category_closure',
+        sa.Column('ancestor_id', sa.UUID(), sa.ForeignKey('categories.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('descendant_id', sa.UUID(), sa.ForeignKey('categories.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('depth', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id'),
+    )
+    op.create_index('ix_category_closure_descendant', 'category_closure', ['descendant_id', 'ancestor_id'])
+    op.create_index('ix_items_category_id', 'items', ['category_id'])
+
+    # Backfill every (ancestor, descendant) pair from the existing parent_id links
+    op.execute(
+        """
+        INSERT INTO category_closure (ancestor_id, descendant_id, depth)
+        WITH RECURSIVE tree (ancestor_id, descendant_id, depth) AS (
+            SELECT id, id, 0 FROM categories
+            UNION ALL
+            SELECT tree.ancestor_id, c.id, tree.depth + 1
+            FROM tree JOIN categories c ON c.parent_id = tree.descendant_id
+        )
+        SELECT ancestor_id, descendant_id, depth FROM tree
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_items_category_id', table_name='items')
+    op.drop_index('ix_category_closure_descendant', table_name='category_closure')
+    op.drop_table('category_closure')
@@ -0,0 +1,24 @@
+"""add stock movements created_at id index
+
+Revision ID: 7b6d1e0f4c29
+Revises: e5a3c9d70f48
+Create Date: 2026-10-16 16:20:11.583904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b6d1e0f4c29'
+down_revision = 'e5a3c9d70f48'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_stock_movements_created_at_id', 'stock_movements', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stock_movements_created_at_id', table_name='stock_movements')
@@ -0,0 +1,34 @@
+"""add recipe components table
+
+Revision ID: 8d2e7a4f1b56
+Revises: 1f3b8c5e9a62
+Create Date: 2026-10-16 18:12:07.664215
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2e7a4f1b56'
+down_revision = '1f3b8c5e9a62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'recipe_components',
+        sa.Column('product_item_id', sa.UUID(), nullable=False),
+        sa.Column('material_item_id', sa.UUID(), nullable=False),
+        sa.Column('quantity_per_unit', sa.Numeric(precision=10, scale=4), nullable=False),
+        sa.ForeignKeyConstraint(['product_item_id'], ['items.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['material_item_id'], ['items.id']),
+        sa.PrimaryKeyConstraint('product_item_id', 'material_item_id'),
+    )
+    op.create_index(op.f('ix_recipe_components_material_item_id'), 'recipe_components', ['material_item_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_recipe_components_material_item_id'), table_name='recipe_components')
+    op.drop_table('recipe_components')
@@ -0,0 +1,45 @@
+"""add item search indexes
+
+Revision ID: 9e4b2d6c8a15
+Revises: 3c1f9a7d2e4b
+Create Date: 2026-10-16 10:03:17.551902
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e4b2d6c8a15'
+down_revision = '3c1f9a7d2e4b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Trigram and full-text indexes are Postgres-only; other databases use the LIKE fallback
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.execute('CREATE INDEX IF NOT EXISTS ix_items_name_trgm ON items USING gin (name gin_trgm_ops)')
+    op.execute('CREATE INDEX IF NOT EXISTS ix_items_sku_trgm ON items USING gin (sku gin_trgm_ops)')
+    # Expression must match SEARCH_DOCUMENT_SQL in app/api/routes/items.py
+    op.execute(
+        """
+        CREATE INDEX IF NOT EXISTS ix_items_search_tsv ON items USING gin (
+          to_tsvector('simple'::regconfig, coalesce(name, '') || ' ' || coalesce(sku, '')
+            || ' ' || coalesce(description, '') || ' ' || coalesce(notes, ''))
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('DROP INDEX IF EXISTS ix_items_search_tsv')
+    op.execute('DROP INDEX IF EXISTS ix_items_sku_trgm')
+    op.execute('DROP INDEX IF EXISTS ix_items_name_trgm')
+    # pg_trgm is left installed; other objects may depend on it
@@ -0,0 +1,93 @@
+"""add kit template components table
+
+Revision ID: a4c7e2f9d813
+Revises: 8d2e7a4f1b56
+Create Date: 2026-10-16 20:41:53.218407
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import json
+import uuid
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4c7e2f9d813'
+down_revision = '8d2e7a4f1b56'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'kit_template_components',
+        sa.Column('template_id', sa.UUID(), nullable=False),
+        sa.Column('item_id', sa.UUID(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('position', sa.SmallInteger(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['template_id'], ['kit_templates.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['item_id'], ['items.id']),
+        sa.PrimaryKeyConstraint('template_id', 'item_id'),
+    )
+    op.create_index('ix_kit_template_components_item_template', 'kit_template_components', ['item_id', 'template_id'], unique=False)
+
+    # Backfill from the JSON bill of materials. Components whose item no
+    # longer exists are dropped; repeated items are merged.
+    conn = op.get_bind()
+    components = sa.table(
+        'kit_template_components',
+        sa.column('template_id', sa.UUID()),
+        sa.column('item_id', sa.UUID()),
+        sa.column('quantity', sa.Integer()),
+        sa.column('position', sa.SmallInteger()),
+    )
+    item_ids = {str(row[0]) for row in conn.execute(sa.text('SELECT id FROM items'))}
+    rows = []
+    for template_id, raw in conn.execute(sa.text('SELECT id, components FROM kit_templates')):
+        bom = json.loads(raw) if isinstance(raw, str) else (raw or [])
+        merged = {}
+        for comp in bom:
+            item_id = str(comp.get('item_id'))
+            if item_id not in item_ids:
+                continue
+            merged[item_id] = merged.get(item_id, 0) + int(comp.get('quantity') or 0)
+        rows.extend(
+            {
+                'template_id': uuid.UUID(str(template_id)),
+                'item_id': uuid.UUID(item_id),
+                'quantity': quantity,
+                'position': position,
+            }
+            for position, (item_id, quantity) in enumerate(merged.items())
+            if quantity > 0
+        )
+    if rows:
+        op.bulk_insert(components, rows)
+
+    op.drop_column('kit_templates', 'components')
+
+
+def downgrade() -> None:
+    op.add_column('kit_templates', sa.Column('components', sa.JSON(), nullable=True))
+
+    conn = op.get_bind()
+    boms = {}
+    for template_id, item_id, item_name, quantity in conn.execute(sa.text(
+        'SELECT c.template_id, c.item_id, i.name, c.quantity '
+        'FROM kit_template_components c JOIN items i ON i.id = c.item_id '
+        'ORDER BY c.template_id, c.position'
+    )):
+        boms.setdefault(str(template_id), []).append(
+            {'item_id': str(item_id), 'item_name': item_name, 'quantity': quantity}
+        )
+    templates = sa.table('kit_templates', sa.column('id', sa.UUID()), sa.column('components', sa.JSON()))
+    for template_id, in conn.execute(sa.text('SELECT id FROM kit_templates')).fetchall():
+        conn.execute(
+            templates.update()
+            .where(templates.c.id == template_id)
+            .values(components=boms.get(str(template_id), []))
+        )
+    op.alter_column('kit_templates', 'components', nullable=False)
+
+    op.drop_index('ix_kit_template_components_item_template', table_name='kit_template_components')
+    op.drop_table('kit_template_components')
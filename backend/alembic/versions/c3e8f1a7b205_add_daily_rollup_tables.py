@@ -0,0 +1,91 @@
+"""add daily rollup tables
+
+Revision ID: c3e8f1a7b205
+Revises: a4c7e2f9d813
+Create Date: 2026-10-17 00:12:41.905316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3e8f1a7b205'
+down_revision = 'a4c7e2f9d813'
+branch_labels = None
+depends_on = None
+
+# Existing enum types from stock_movements
+reference_type = postgresql.ENUM(
+    'PRODUCTION', 'PURCHASE', 'ASSEMBLY', 'DISTRIBUTION', 'ADJUSTMENT', name='referencetype', create_type=False
+)
+movement_type = postgresql.ENUM('IN', 'OUT', 'ADJUSTMENT', name='movementtype', create_type=False)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'daily_item_flow',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('item_id', sa.UUID(), nullable=False),
+        sa.Column('reference_type', reference_type, nullable=False),
+        sa.Column('movement_type', movement_type, nullable=False),
+        sa.Column('quantity', sa.Numeric(precision=14, scale=2), nullable=False, server_default=sa.text('0')),
+        sa.Column('movements', sa.Integer(), nullable=False, server_default=sa.text('0')),
+        sa.ForeignKeyConstraint(['item_id'], ['items.id']),
+        sa.PrimaryKeyConstraint('day', 'item_id', 'reference_type', 'movement_type'),
+    )
+    op.create_index('ix_daily_item_flow_item_day', 'daily_item_flow', ['item_id', 'day'], unique=False)
+    op.create_table(
+        'daily_user_activity',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('operation', reference_type, nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False, server_default=sa.text('0')),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('day', 'user_id', 'operation'),
+    )
+
+    if op.get_bind().dialect.name != 'postgresql':
+        # Backfill with: python -m scripts.rebuild_rollups
+        return
+
+    # Backfill from existing history (same rules as rebuild_rollups)
+    op.execute(
+        """
+        INSERT INTO daily_user_activity (day, user_id, operation, count)
+        SELECT date(production_date), produced_by_user_id, 'PRODUCTION'::referencetype, count(*)
+        FROM productions GROUP BY 1, 2
+        UNION ALL
+        SELECT date(purchase_date), received_by_user_id, 'PURCHASE'::referencetype, count(*)
+        FROM purchases GROUP BY 1, 2
+        UNION ALL
+        SELECT date(distribution_date), distributed_by_user_id, 'DISTRIBUTION'::referencetype, count(*)
+        FROM distributions GROUP BY 1, 2
+        UNION ALL
+        SELECT date(assembly_date), assembled_by_user_id, 'ASSEMBLY'::referencetype, count(*)
+        FROM assemblies GROUP BY 1, 2
+        UNION ALL
+        SELECT date(created_at), user_id, 'ADJUSTMENT'::referencetype, count(*)
+        FROM stock_movements WHERE reference_type = 'ADJUSTMENT' GROUP BY 1, 2
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO daily_item_flow (day, item_id, reference_type, movement_type, quantity, movements)
+        SELECT date(COALESCE(p.production_date, pu.purchase_date, d.distribution_date, a.assembly_date, m.created_at)),
+               m.item_id, m.reference_type, m.movement_type, sum(m.quantity), count(*)
+        FROM stock_movements m
+        LEFT JOIN productions p ON m.reference_type = 'PRODUCTION' AND p.id = m.reference_id
+        LEFT JOIN purchases pu ON m.reference_type = 'PURCHASE' AND pu.id = m.reference_id
+        LEFT JOIN distributions d ON m.reference_type = 'DISTRIBUTION' AND d.id = m.reference_id
+        LEFT JOIN assemblies a ON m.reference_type = 'ASSEMBLY' AND a.id = m.reference_id
+        GROUP BY 1, 2, 3, 4
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('daily_user_activity')
+    op.drop_index('ix_daily_item_flow_item_day', table_name='daily_item_flow')
+    op.drop_table('daily_item_flow')
@@ -0,0 +1,25 @@
+"""add items updated_at index
+
+Revision ID: c7d05e3b91f2
+Revises: 9e4b2d6c8a15
+Create Date: 2026-10-16 11:40:02.734519
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7d05e3b91f2'
+down_revision = '9e4b2d6c8a15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # max(updated_at) is the catalog version behind item list ETags
+    op.create_index('ix_items_updated_at', 'items', ['updated_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_items_updated_at', table_name='items')
@@ -0,0 +1,39 @@
+"""add item archival
+
+Revision ID: d2f8b4a61e93
+Revises: 4a8e6f1c0b37
+Create Date: 2026-10-16 14:22:09.845173
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2f8b4a61e93'
+down_revision = '4a8e6f1c0b37'
+branch_labels = None
+depends_on = None
+
+
+ACTIVE = sa.text('archived_at IS NULL')
+ACTIVE_WITH_MINIMUM = sa.text('archived_at IS NULL AND minimum_stock_level IS NOT NULL')
+
+
+def upgrade() -> None:
+    op.add_column('items', sa.Column('archived_at', sa.DateTime(), nullable=True))
+
+    # Partial indexes cover only active rows, so archived items add no cost to default reads
+    op.create_index('ix_items_active_name_id', 'items', ['name', 'id'],
+                    postgresql_where=ACTIVE, sqlite_where=ACTIVE)
+    op.create_index('ix_items_active_category', 'items', ['category'],
+                    postgresql_where=ACTIVE, sqlite_where=ACTIVE)
+    op.create_index('ix_items_active_low_stock', 'items', ['current_stock_level', 'minimum_stock_level'],
+                    postgresql_where=ACTIVE_WITH_MINIMUM, sqlite_where=ACTIVE_WITH_MINIMUM)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_items_active_low_stock', table_name='items')
+    op.drop_index('ix_items_active_category', table_name='items')
+    op.drop_index('ix_items_active_name_id', table_name='items')
+    op.drop_column('items', 'archived_at')
@@ -0,0 +1,52 @@
+"""add stat counters table
+
+Revision ID: e5a3c9d70f48
+Revises: d2f8b4a61e93
+Create Date: 2026-10-16 15:48:33.402716
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a3c9d70f48'
+down_revision = 'd2f8b4a61e93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'stat_counters',
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('shard', sa.SmallInteger(), nullable=False),
+        sa.Column('value', sa.BigInteger(), nullable=False, server_default=sa.text('0')),
+        sa.PrimaryKeyConstraint('name', 'shard'),
+    )
+
+    if op.get_bind().dialect.name != 'postgresql':
+        # The app recomputes counters on startup; nothing to seed here
+        return
+
+    # Seed counters from existing data (shard 0)
+    op.execute(
+        """
+        INSERT INTO stat_counters (name, shard, value)
+        SELECT 'items.total', 0, count(*) FROM items WHERE archived_at IS NULL
+        UNION ALL
+        SELECT 'items.low_stock', 0, count(*) FROM items
+        WHERE archived_at IS NULL AND minimum_stock_level IS NOT NULL
+          AND current_stock_level <= minimum_stock_level
+        UNION ALL
+        SELECT 'productions:' || to_char(production_date, 'YYYY-MM-DD'), 0, count(*)
+        FROM productions GROUP BY to_char(production_date, 'YYYY-MM-DD')
+        UNION ALL
+        SELECT 'distributions:' || to_char(distribution_date, 'YYYY-MM-DD'), 0, count(*)
+        FROM distributions GROUP BY to_char(distribution_date, 'YYYY-MM-DD')
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('stat_counters')
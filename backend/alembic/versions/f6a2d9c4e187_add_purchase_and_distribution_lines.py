@@ -0,0 +1,139 @@
+"""add purchase and distribution lines
+
+Revision ID: f6a2d9c4e187
+Revises: c3e8f1a7b205
+Create Date: 2026-10-17 00:48:19.530274
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from decimal import Decimal
+import json
+import uuid
+
+
+# revision identifiers, used by Alembic.
+revision = 'f6a2d9c4e187'
+down_revision = 'c3e8f1a7b205'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+
+
+def _backfill(conn, source, table, build) -> None:
+    """Insert build(record id, record date, line number, item id, line) rows for every JSON line."""
+    item_ids = {uuid.UUID(str(row[0])) for row in conn.execute(sa.text('SELECT id FROM items'))}
+    rows = []
+    for record_id, record_date, raw in conn.execute(source):
+        lines = json.loads(raw) if isinstance(raw, str) else (raw or [])
+        for line_no, line in enumerate(lines):
+            # Lines whose item no longer exists cannot satisfy the foreign key
+            try:
+                item_id = uuid.UUID(str(line.get('item_id')))
+            except ValueError:
+                continue
+            if item_id not in item_ids or line.get('quantity') is None:
+                continue
+            rows.append(build(uuid.UUID(str(record_id)), record_date, line_no, item_id, line))
+            if len(rows) >= BATCH_SIZE:
+                op.bulk_insert(table, rows)
+                rows = []
+    if rows:
+        op.bulk_insert(table, rows)
+
+
+def _decimal(value):
+    return None if value is None else Decimal(str(value)).quantize(Decimal('0.01'))
+
+
+def upgrade() -> None:
+    op.create_table(
+        'purchase_lines',
+        sa.Column('purchase_id', sa.UUID(), nullable=False),
+        sa.Column('line_no', sa.SmallInteger(), nullable=False),
+        sa.Column('item_id', sa.UUID(), nullable=False),
+        sa.Column('purchase_date', sa.DateTime(), nullable=False),
+        sa.Column('quantity', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('unit_cost', sa.Numeric(precision=10, scale=2), nullable=True),
+        sa.ForeignKeyConstraint(['purchase_id'], ['purchases.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['item_id'], ['items.id']),
+        sa.PrimaryKeyConstraint('purchase_id', 'line_no'),
+    )
+    op.create_index('ix_purchase_lines_item_date', 'purchase_lines', ['item_id', 'purchase_date'], unique=False)
+    op.create_table(
+        'distribution_lines',
+        sa.Column('distribution_id', sa.UUID(), nullable=False),
+        sa.Column('line_no', sa.SmallInteger(), nullable=False),
+        sa.Column('item_id', sa.UUID(), nullable=False),
+        sa.Column('distribution_date', sa.DateTime(), nullable=False),
+        sa.Column('quantity', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.ForeignKeyConstraint(['distribution_id'], ['distributions.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['item_id'], ['items.id']),
+        sa.PrimaryKeyConstraint('distribution_id', 'line_no'),
+    )
+    op.create_index(
+        'ix_distribution_lines_item_date', 'distribution_lines', ['item_id', 'distribution_date'], unique=False
+    )
+
+    # Backfill from the JSON item arrays, which stay in place
+    conn = op.get_bind()
+    purchase_lines = sa.table(
+        'purchase_lines',
+        sa.column('purchase_id', sa.UUID()),
+        sa.column('line_no', sa.SmallInteger()),
+        sa.column('item_id', sa.UUID()),
+        sa.column('purchase_date', sa.DateTime()),
+        sa.column('quantity', sa.Numeric()),
+        sa.column('unit_cost', sa.Numeric()),
+    )
+    purchases = sa.table(
+        'purchases',
+        sa.column('id', sa.UUID()),
+        sa.column('purchase_date', sa.DateTime()),
+        sa.column('items_purchased', sa.JSON()),
+    )
+    _backfill(
+        conn, sa.select(purchases.c.id, purchases.c.purchase_date, purchases.c.items_purchased), purchase_lines,
+        lambda record_id, record_date, line_no, item_id, line: {
+            'purchase_id': record_id,
+            'line_no': line_no,
+            'item_id': item_id,
+            'purchase_date': record_date,
+            'quantity': _decimal(line['quantity']),
+            'unit_cost': _decimal(line.get('unit_cost')),
+        }
+    )
+    distribution_lines = sa.table(
+        'distribution_lines',
+        sa.column('distribution_id', sa.UUID()),
+        sa.column('line_no', sa.SmallInteger()),
+        sa.column('item_id', sa.UUID()),
+        sa.column('distribution_date', sa.DateTime()),
+        sa.column('quantity', sa.Numeric()),
+    )
+    distributions = sa.table(
+        'distributions',
+        sa.column('id', sa.UUID()),
+        sa.column('distribution_date', sa.DateTime()),
+        sa.column('items_distributed', sa.JSON()),
+    )
+    _backfill(
+        conn,
+        sa.select(distributions.c.id, distributions.c.distribution_date, distributions.c.items_distributed),
+        distribution_lines,
+        lambda record_id, record_date, line_no, item_id, line: {
+            'distribution_id': record_id,
+            'line_no': line_no,
+            'item_id': item_id,
+            'distribution_date': record_date,
+            'quantity': _decimal(line['quantity']),
+        }
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_distribution_lines_item_date', table_name='distribution_lines')
+    op.drop_table('distribution_lines')
+    op.drop_index('ix_purchase_lines_item_date', table_name='purchase_lines')
+    op.drop_table('purchase_lines')
@@ -0,0 +1,223 @@
+"""Incrementally maintained dashboard counters.
+
+Write paths add to these counters in the same transaction as the change
+they describe, so dashboard stats are a handful of primary-key reads no
+matter how much history exists. ``recompute_counters`` rebuilds them from
+the source tables and runs periodically to heal any drift.
+"""
+from sqlalchemy import func, insert, update, delete, text
+from sqlalchemy.orm import Session
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+import random
+
+from app.db.models.counter import StatCounter
+from app.db.models.item import Item
+from app.db.models.production import Production
+from app.db.models.operations import Distribution
+
+COUNTER_SHARDS = 8
+
+ITEMS_TOTAL = "items.total"
+ITEMS_LOW_STOCK = "items.low_stock"
+PRODUCTIONS = "productions"
+DISTRIBUTIONS = "distributions"
+# Bumped whenever an item name changes or an item is deleted; caches of
+# resolved item names compare against it (never recomputed)
+ITEM_NAMES_VERSION = "items.names_version"
+# Bumped by every item write (create, edit, archive, delete, stock change);
+# the item-list ETag is built from it (never recomputed)
+CATALOG_VERSION = "items.catalog_version"
+
+# Days of per-day buckets rebuilt by recompute_counters (covers the dashboard's 7-day window)
+RECOMPUTE_DAYS = 8
+
+
+def day_counter(kind: str, day: date) -> str:
+    """Name of the per-day bucket for an operation kind."""
+    return f"{kind}:{day.isoformat()}"
+
+
+def bump(db: Session, amounts: Dict[str, int]) -> None:
+    """Add amounts to counters on a random shard (upsert)."""
+    amounts = {name: amount for name, amount in amounts.items() if amount}
+    if not amounts:
+        return
+
+    shard = random.randrange(COUNTER_SHARDS)
+    rows = [{"name": name, "shard": shard, "value": amount} for name, amount in amounts.items()]
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        stmt = upsert(StatCounter).values(rows)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["name", "shard"],
+            set_={"value": StatCounter.value + stmt.excluded.value}
+        ))
+        return
+
+    for row in rows:
+        result = db.execute(
+            update(StatCounter)
+            .where(StatCounter.name == row["name"], StatCounter.shard == row["shard"])
+            .values(value=StatCounter.value + row["value"])
+        )
+        if result.rowcount == 0:
+            db.execute(insert(StatCounter).values(**row))
+
+
+def is_low(level: Optional[Decimal], minimum: Optional[Decimal]) -> bool:
+    """Same rule as the low_stock_only filter: minimum set and level at or below it."""
+    return minimum is not None and level is not None and level <= minimum
+
+
+def item_state(item) -> Tuple[bool, bool]:
+    """(counted as active, counted as low stock) for an item or item-like row."""
+    active = item.archived_at is None
+    return active, active and is_low(item.current_stock_level, item.minimum_stock_level)
+
+
+def track_item_change(db: Session, before: Optional[Tuple[bool, bool]], after: Optional[Tuple[bool, bool]]) -> None:
+    """Adjust item counters for a create (before=None), update, archive or delete (after=None)."""
+    before = before or (False, False)
+    after = after or (False, False)
+    bump(db, {
+        ITEMS_TOTAL: int(after[0]) - int(before[0]),
+        ITEMS_LOW_STOCK: int(after[1]) - int(before[1]),
+        CATALOG_VERSION: 1,
+    })
+
+
+def track_items_added(db: Session, states: Iterable[Tuple[bool, bool]]) -> None:
+    """Count a batch of newly created items with one upsert."""
+    states = list(states)
+    bump(db, {
+        ITEMS_TOTAL: sum(active for active, _ in states),
+        ITEMS_LOW_STOCK: sum(low for _, low in states),
+        CATALOG_VERSION: 1,
+    })
+
+
+def track_stock_levels(db: Session, rows, deltas: Dict) -> None:
+    """Adjust the low-stock counter for items whose level just crossed their minimum,
+    and bump the catalog version.
+
+    ``rows`` are the rows returned by the stock update (new levels) and
+    ``deltas`` the amounts applied, so the previous level is new - delta.
+    """
+    change = 0
+    for row in rows:
+        if row.archived_at is not None:
+            continue
+        previous = row.current_stock_level - deltas[row.id]
+        change += int(is_low(row.current_stock_level, row.minimum_stock_level))
+        change -= int(is_low(previous, row.minimum_stock_level))
+    bump(db, {ITEMS_LOW_STOCK: change, CATALOG_VERSION: 1})
+
+
+def track_item_renamed(db: Session) -> None:
+    """Invalidate cached item names (renamed or deleted item)."""
+    bump(db, {ITEM_NAMES_VERSION: 1})
+
+
+def counter_value(db: Session, name: str) -> int:
+    """Current value of a counter (sum of its shards)."""
+    return int(db.query(func.sum(StatCounter.value)).filter(StatCounter.name == name).scalar() or 0)
+
+
+def track_operation(db: Session, kind: str, when: datetime) -> None:
+    """Count one production/distribution in the bucket for its operation date."""
+    bump(db, {day_counter(kind, when.date()): 1})
+
+
+def dashboard_counts(db: Session, now: datetime) -> Dict[str, int]:
+    """Counters behind the dashboard, for the 7 days up to ``now``.
+
+    Whole days come from per-day buckets; the partial first day of the
+    window is counted from the source table, which touches at most one
+    day of rows.
+    """
+    week_start = now - timedelta(days=7)
+    first_full_day = week_start.date() + timedelta(days=1)
+    days = [first_full_day + timedelta(days=i) for i in range((now.date() - first_full_day).days + 1)]
+
+    names = [ITEMS_TOTAL, ITEMS_LOW_STOCK]
+    names += [day_counter(PRODUCTIONS, d) for d in days] + [day_counter(DISTRIBUTIONS, d) for d in days]
+    values = dict(
+        db.query(StatCounter.name, func.sum(StatCounter.value))
+        .filter(StatCounter.name.in_(names))
+        .group_by(StatCounter.name)
+        .all()
+    )
+
+    first_full_day_start = datetime.combine(first_full_day, time.min)
+    partial_productions = db.query(func.count(Production.id)).filter(
+        Production.production_date >= week_start,
+        Production.production_date < first_full_day_start
+    ).scalar()
+    partial_distributions = db.query(func.count(Distribution.id)).filter(
+        Distribution.distribution_date >= week_start,
+        Distribution.distribution_date < first_full_day_start
+    ).scalar()
+
+    return {
+        "total_items": int(values.get(ITEMS_TOTAL) or 0),
+        "low_stock_items": int(values.get(ITEMS_LOW_STOCK) or 0),
+        "productions_this_week": (partial_productions or 0) + sum(
+            int(values.get(day_counter(PRODUCTIONS, d)) or 0) for d in days
+        ),
+        "distributions_this_week": (partial_distributions or 0) + sum(
+            int(values.get(day_counter(DISTRIBUTIONS, d)) or 0) for d in days
+        ),
+    }
+
+
+def recompute_counters(db: Session, days: int = RECOMPUTE_DAYS) -> None:
+    """Rebuild item counters and recent per-day buckets from the source tables.
+
+    On Postgres the counters table is locked for the duration, so writers
+    wait for the rebuild instead of having their increments overwritten.
+    The caller commits.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("LOCK TABLE stat_counters IN EXCLUSIVE MODE"))
+
+    active = Item.archived_at.is_(None)
+    exact = {
+        ITEMS_TOTAL: db.query(func.count(Item.id)).filter(active).scalar() or 0,
+        ITEMS_LOW_STOCK: db.query(func.count(Item.id)).filter(
+            active,
+            Item.minimum_stock_level.isnot(None),
+            Item.current_stock_level <= Item.minimum_stock_level
+        ).scalar() or 0,
+    }
+
+    today = datetime.utcnow().date()
+    since = datetime.combine(today - timedelta(days=days - 1), time.min)
+    for d in range(days):
+        day = today - timedelta(days=d)
+        exact[day_counter(PRODUCTIONS, day)] = 0
+        exact[day_counter(DISTRIBUTIONS, day)] = 0
+    for kind, column, key in (
+        (PRODUCTIONS, Production.production_date, Production.id),
+        (DISTRIBUTIONS, Distribution.distribution_date, Distribution.id),
+    ):
+        day_expr = func.date(column)
+        rows = db.query(day_expr, func.count(key)).filter(column >= since).group_by(day_expr).all()
+        for day, count in rows:
+            day = day if isinstance(day, date) else date.fromisoformat(str(day))
+            if day <= today:
+                exact[day_counter(kind, day)] = count
+
+    db.execute(
+        delete(StatCounter)
+        .where(StatCounter.name.in_(list(exact)))
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(insert(StatCounter), [
+        {"name": name, "shard": 0, "value": value} for name, value in exact.items()
+    ])
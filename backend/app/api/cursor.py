@@ -0,0 +1,24 @@
+"""Opaque keyset-pagination cursors shared by the paged list endpoints."""
+from fastapi import HTTPException
+from typing import Callable
+import base64
+import json
+
+
+def encode_cursor(*values: str) -> str:
+    """Encode the keyset position of the last row on a page, e.g. (name, id)."""
+    raw = json.dumps(list(values)).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *parsers: Callable) -> tuple:
+    """Decode a cursor produced by encode_cursor, parsing each value in turn.
+
+    Raises 400 if the cursor is malformed or has the wrong number of values.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+        return tuple(parse(value) for parse, value in zip(parsers, values, strict=True))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
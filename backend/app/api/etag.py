@@ -0,0 +1,43 @@
+"""Weak ETag helpers for conditional GETs on catalog reads."""
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+from sqlalchemy.orm import Session
+
+from app.api.counters import counter_value, CATALOG_VERSION
+
+# Clients must revalidate, but may keep the body and replay it on 304
+CACHE_CONTROL = "private, no-cache"
+
+
+def catalog_version(db: Session) -> str:
+    """Cheap fingerprint of the whole items table.
+
+    Every item write bumps the catalog version counter in its own
+    transaction, so the committed sum grows with each commit whatever order
+    the writers flushed in; reading it touches at most one row per shard.
+    """
+    return str(counter_value(db, CATALOG_VERSION))
+
+
+def make_etag(*parts: object) -> str:
+    """Build a weak ETag from the given parts."""
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check If-None-Match using weak comparison (RFC 9110 13.1.2)."""
+    header: Optional[str] = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response carrying the current validator."""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
@@ -0,0 +1,140 @@
+"""Live events for dashboards, pushed over Server-Sent Events.
+
+Write paths call ``queue_event`` inside their transaction. Queued events
+are published only once the session commits (and dropped on rollback),
+so listeners never see changes that did not happen.
+
+By default events are fanned out in-process to every open stream. With
+``EVENTS_PG_NOTIFY`` enabled on Postgres, events are sent with NOTIFY as
+part of the commit instead, and each worker LISTENs on one connection and
+fans them out locally, so every worker's streams see every event.
+"""
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from decimal import Decimal
+from typing import Optional, Set, Tuple
+import asyncio
+import json
+import select
+import threading
+import time
+
+from app.core.config import settings
+
+PENDING_EVENTS_KEY = "pending_events"
+NOTIFY_CHANNEL = "aid_events"
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class EventBroadcaster:
+    """Fan events out to asyncio subscribers from any thread."""
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self._queue_size = queue_size
+        self._subscribers: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self._queue_size)
+        with self._lock:
+            self._subscribers.add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        with self._lock:
+            self._subscribers = {s for s in self._subscribers if s[1] is not queue}
+
+    def publish(self, message: dict) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, message)
+            except RuntimeError:
+                # Event loop already closed
+                self.unsubscribe(queue)
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, message: dict) -> None:
+        # A slow client loses its oldest events rather than stalling everyone
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(message)
+
+
+broadcaster = EventBroadcaster()
+
+
+def queue_event(db: Session, event_type: str, data: dict) -> None:
+    """Queue an event to publish when ``db`` commits."""
+    db.info.setdefault(PENDING_EVENTS_KEY, []).append({
+        "type": event_type,
+        "data": jsonable_encoder(data, custom_encoder={Decimal: str}),
+    })
+
+
+def _uses_notify(session: Session) -> bool:
+    return settings.EVENTS_PG_NOTIFY and session.get_bind().dialect.name == "postgresql"
+
+
+@event.listens_for(Session, "before_commit")
+def _notify_pending(session: Session) -> None:
+    pending = session.info.get(PENDING_EVENTS_KEY)
+    if pending and _uses_notify(session):
+        # NOTIFY is transactional: delivered only if this commit succeeds
+        session.execute(
+            text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload"),
+            {"channel": NOTIFY_CHANNEL, "payloads": [json.dumps(message) for message in pending]}
+        )
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending(session: Session) -> None:
+    pending = session.info.pop(PENDING_EVENTS_KEY, None)
+    if pending and not _uses_notify(session):
+        for message in pending:
+            broadcaster.publish(message)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(PENDING_EVENTS_KEY, None)
+
+
+def start_pg_listener(engine, reconnect_seconds: int = 5) -> Optional[threading.Thread]:
+    """LISTEN for events from all workers and publish them locally.
+
+    Holds one dedicated connection per worker, idle between events.
+    """
+    if engine.dialect.name != "postgresql":
+        return None
+
+    def loop() -> None:
+        while True:
+            pooled = None
+            try:
+                pooled = engine.raw_connection()
+                pooled.detach()
+                conn = pooled.driver_connection
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+                while True:
+                    if select.select([conn], [], [], 30) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notification = conn.notifies.pop(0)
+                        broadcaster.publish(json.loads(notification.payload))
+            except Exception:
+                if pooled is not None:
+                    try:
+                        pooled.close()
+                    except Exception:
+                        pass
+                time.sleep(reconnect_seconds)
+
+    thread = threading.Thread(target=loop, name="events-listener", daemon=True)
+    thread.start()
+    return thread
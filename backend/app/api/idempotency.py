@@ -0,0 +1,126 @@
+"""Idempotency-Key support for retry-safe write routes.
+
+A route that accepts the ``Idempotency-Key`` header calls
+``idempotent_replay`` before doing any work and ``store_idempotent_response``
+just before committing. The key row is inserted in the route's own
+transaction, so:
+
+- a retry after a successful commit finds the stored response and returns
+  it without touching items or stock movements;
+- a concurrent duplicate blocks on the key's primary key until the first
+  request finishes, then replays its response;
+- a request that fails rolls back its key too, so the client may retry it.
+"""
+from fastapi import HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Optional
+import hashlib
+import uuid
+
+from app.core.config import settings
+from app.db.models.idempotency import IdempotencyKey
+
+REPLAY_HEADER = "Idempotent-Replayed"
+
+
+def _request_hash(request: Request, payload: Optional[BaseModel]) -> str:
+    body = payload.model_dump_json() if payload is not None else ""
+    return hashlib.sha256(f"{request.method} {request.url.path}\n{body}".encode()).hexdigest()
+
+
+def _replay(record: IdempotencyKey, request_hash: str) -> JSONResponse:
+    if record.request_hash != request_hash:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+    return JSONResponse(
+        content=record.response_body,
+        status_code=record.status_code,
+        headers={REPLAY_HEADER: "true"}
+    )
+
+
+def _live_record(db: Session, user_id: uuid.UUID, key: str) -> Optional[IdempotencyKey]:
+    return db.query(IdempotencyKey).filter(
+        IdempotencyKey.user_id == user_id,
+        IdempotencyKey.key == key,
+        IdempotencyKey.expires_at > datetime.utcnow()
+    ).first()
+
+
+def idempotent_replay(
+    db: Session,
+    request: Request,
+    key: Optional[str],
+    user_id: uuid.UUID,
+    payload: Optional[BaseModel] = None
+) -> Optional[JSONResponse]:
+    """Return the stored response for a repeated key, or reserve the key.
+
+    Returns None when the route should run (no key, or key reserved in the
+    current transaction). Raises 422 if the key was used for a different
+    method, path or body.
+    """
+    if not key:
+        return None
+
+    request_hash = _request_hash(request, payload)
+    record = _live_record(db, user_id, key)
+    if record:
+        return _replay(record, request_hash)
+
+    now = datetime.utcnow()
+    try:
+        with db.begin_nested():
+            # An expired row for this key would otherwise block the insert
+            db.execute(
+                delete(IdempotencyKey)
+                .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key, IdempotencyKey.expires_at <= now)
+                .execution_options(synchronize_session=False)
+            )
+            db.add(IdempotencyKey(
+                user_id=user_id,
+                key=key,
+                request_hash=request_hash,
+                created_at=now,
+                expires_at=now + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+            ))
+            db.flush()
+    except IntegrityError:
+        # A concurrent request with the same key committed first
+        record = _live_record(db, user_id, key)
+        if record is None:
+            raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is in progress")
+        return _replay(record, request_hash)
+
+    return None
+
+
+def store_idempotent_response(
+    db: Session,
+    key: Optional[str],
+    user_id: uuid.UUID,
+    content,
+    status_code: int = 200
+) -> None:
+    """Attach the response to the key reserved by idempotent_replay (caller commits)."""
+    if not key:
+        return
+    record = db.get(IdempotencyKey, (user_id, key))
+    record.status_code = status_code
+    record.response_body = jsonable_encoder(content, custom_encoder={Decimal: str})
+
+
+def purge_expired_keys(db: Session) -> int:
+    """Delete expired idempotency keys; returns the number removed (caller commits)."""
+    result = db.execute(
+        delete(IdempotencyKey)
+        .where(IdempotencyKey.expires_at <= datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
@@ -0,0 +1,181 @@
+"""Integer assembly planning across kit templates that share components.
+
+Chooses how many of each kit to assemble so the weighted number of kits
+is as large as possible without using more of any component than is in
+stock:
+
+    maximize    sum(weight[t] * x[t])
+    subject to  sum(per_kit[t][c] * x[t]) <= stock[c]   for every component c
+                0 <= x[t] <= cap[t], x[t] integer
+
+This is a multidimensional knapsack, so the solver is a heuristic tuned for
+interactive use with pure Python: greedy fills ordered by weight per
+"priced" component use, with component prices adjusted over a few rounds
+(scarce components get dearer), followed by single-kit exchange passes.
+Work per round is linear in the total number of template components.
+"""
+from typing import Dict, Hashable, List, Tuple
+
+PRICE_ROUNDS = 30
+EXCHANGE_PASSES = 3
+
+Recipe = List[Tuple[Hashable, int]]  # (component key, units per kit)
+
+
+def _room(recipe: Recipe, remaining: Dict[Hashable, int], headroom: int) -> int:
+    """How many more kits fit in the remaining stock (at most headroom)."""
+    room = headroom
+    for component, per_kit in recipe:
+        fits = remaining[component] // per_kit
+        if fits < room:
+            if fits <= 0:
+                return 0
+            room = fits
+    return max(room, 0)
+
+
+def _add(t, n, recipes, x, remaining, journal) -> None:
+    """Change template t by n kits, recording the change so it can be undone."""
+    x[t] += n
+    for component, per_kit in recipes[t]:
+        remaining[component] -= per_kit * n
+    journal.append((t, n))
+
+
+def _undo(journal, recipes, x, remaining) -> None:
+    for t, n in reversed(journal):
+        x[t] -= n
+        for component, per_kit in recipes[t]:
+            remaining[component] += per_kit * n
+
+
+def _fill(order, recipes, caps, x, remaining, journal=None) -> None:
+    """Add as many kits as fit, template by template in order."""
+    journal = [] if journal is None else journal
+    for t in order:
+        room = _room(recipes[t], remaining, caps[t] - x[t])
+        if room:
+            _add(t, room, recipes, x, remaining, journal)
+
+
+def _drop_one(t, order, recipes, caps, x, remaining, journal, neighbors) -> None:
+    """One kit of t fewer, with the freed stock refilled elsewhere."""
+    if not x[t]:
+        return
+    _add(t, -1, recipes, x, remaining, journal)
+    _fill([u for u in order if u != t and u in neighbors[t]], recipes, caps, x, remaining, journal)
+
+
+def _force_one(t, order, recipes, caps, x, remaining, journal, neighbors) -> None:
+    """One more kit of t, making room by dropping later templates' kits, then refill."""
+    if x[t] >= caps[t]:
+        return
+    _add(t, 1, recipes, x, remaining, journal)
+    needs = {c for c, _ in recipes[t]}
+    for u in reversed(order):
+        short = {c for c in needs if remaining[c] < 0}
+        if not short:
+            break
+        if u == t or not x[u]:
+            continue
+        competing = [c for c, _ in recipes[u] if c in short]
+        if competing:
+            # Fewest kits of u that clear its share of the shortage
+            per_kit = dict(recipes[u])
+            n = min(x[u], max(-(remaining[c] // per_kit[c]) for c in competing))
+            _add(u, -n, recipes, x, remaining, journal)
+    if any(remaining[c] < 0 for c in needs):
+        return
+    # Only templates sharing a component with a dropped one can have gained room
+    freed = set().union(*(neighbors[u] for u, n in journal if n < 0))
+    _fill([u for u in order if u in freed], recipes, caps, x, remaining, journal)
+
+
+def solve_kit_plan(
+    recipes: Dict[Hashable, Recipe],
+    stock: Dict[Hashable, int],
+    weights: Dict[Hashable, float],
+    caps: Dict[Hashable, int],
+    rounds: int = PRICE_ROUNDS
+) -> Dict[Hashable, int]:
+    """Kits to assemble per template.
+
+    ``recipes`` maps template -> [(component, units per kit)], ``stock`` maps
+    component -> whole units available, ``caps`` is the most kits wanted per
+    template. Components missing from ``stock`` count as zero.
+    """
+    stock = {c: max(int(stock.get(c, 0)), 0) for recipe in recipes.values() for c, _ in recipe}
+    templates = [t for t, recipe in recipes.items() if recipe and caps.get(t, 0) > 0 and weights.get(t, 0) > 0]
+    plan = {t: 0 for t in recipes}
+    if not templates:
+        return plan
+
+    # Initial prices: how oversubscribed each component is if every template got its cap
+    demand = {c: 0 for c in stock}
+    for t in templates:
+        for component, per_kit in recipes[t]:
+            demand[component] += per_kit * caps[t]
+    prices = {c: demand[c] / max(stock[c], 1) + 1e-9 for c in stock}
+
+    def value(x):
+        return sum(weights[t] * x[t] for t in templates)
+
+    best_x, best_value, best_order = None, -1.0, None
+    seen_orders = set()
+    for _ in range(rounds):
+        order = sorted(
+            templates,
+            key=lambda t: weights[t] / sum(per_kit * prices[c] for c, per_kit in recipes[t]),
+            reverse=True
+        )
+        key = tuple(order)
+        if key in seen_orders:
+            break
+        seen_orders.add(key)
+
+        x = {t: 0 for t in templates}
+        remaining = dict(stock)
+        _fill(order, recipes, caps, x, remaining)
+        current = value(x)
+        if current > best_value:
+            best_x, best_value, best_order = x, current, order
+
+        # Components this fill used up get dearer; ones left over get cheaper
+        for component in prices:
+            if stock[component] and remaining[component] * 10 < stock[component]:
+                prices[component] *= 1.5
+            else:
+                prices[component] *= 0.8
+
+    x = dict(best_x)
+    remaining = dict(stock)
+    for t in templates:
+        for component, per_kit in recipes[t]:
+            remaining[component] -= per_kit * x[t]
+
+    users = {}
+    for t in templates:
+        for component, _ in recipes[t]:
+            users.setdefault(component, set()).add(t)
+    neighbors = {t: set().union(*(users[c] for c, _ in recipes[t])) for t in templates}
+
+    # Exchange passes, keeping any move that raises the total weight:
+    # - drop one kit of t and refill the others with the freed stock;
+    # - force one more kit of t, dropping kits of lower-priority templates
+    #   that compete for its components, then refill.
+    for _ in range(EXCHANGE_PASSES):
+        improved = False
+        for t in best_order:
+            for move in (_drop_one, _force_one):
+                journal = []
+                move(t, best_order, recipes, caps, x, remaining, journal, neighbors)
+                infeasible = any(remaining[c] < 0 for c, _ in recipes[t])
+                if not infeasible and sum(weights[u] * n for u, n in journal) > 1e-9:
+                    improved = True
+                else:
+                    _undo(journal, recipes, x, remaining)
+        if not improved:
+            break
+
+    plan.update(x)
+    return plan
@@ -0,0 +1,162 @@
+"""Per-day rollups of stock flow and user activity, maintained on every write.
+
+Write paths call ``track_rollups`` for each operation they record. The
+increments are summed per transaction and upserted into
+``daily_item_flow`` and ``daily_user_activity`` just before it commits
+(and dropped on rollback), so a report over any range reads one row per
+day and key instead of every raw operation. ``rebuild_rollups`` recomputes
+them from the source tables for backfill or after direct database edits.
+"""
+from sqlalchemy import event, func, insert, update, delete, select, cast, literal, and_, text
+from sqlalchemy.orm import Session, aliased
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Iterable, Optional
+import uuid
+
+from app.db.models.rollup import DailyItemFlow, DailyUserActivity
+from app.db.models.production import Production
+from app.db.models.operations import Purchase, Distribution, Assembly
+from app.db.models.stock_movement import StockMovement, MovementType, ReferenceType
+
+PENDING_ROLLUPS_KEY = "pending_rollups"
+
+
+def _field(movement, name: str):
+    # Movements are StockMovement objects or the dicts used for bulk inserts
+    return movement[name] if isinstance(movement, dict) else getattr(movement, name)
+
+
+def track_rollups(
+    db: Session,
+    when: datetime,
+    user_id: uuid.UUID,
+    operation: ReferenceType,
+    movements: Iterable = ()
+) -> None:
+    """Count one operation by ``user_id`` on the day of ``when``, and its stock movements."""
+    day = when.date()
+    flow, activity = db.info.setdefault(PENDING_ROLLUPS_KEY, ({}, {}))
+    activity[(day, user_id, operation)] = activity.get((day, user_id, operation), 0) + 1
+    for movement in movements:
+        key = (day, _field(movement, "item_id"), _field(movement, "reference_type"), _field(movement, "movement_type"))
+        quantity, count = flow.get(key, (Decimal(0), 0))
+        flow[key] = (quantity + Decimal(_field(movement, "quantity")), count + 1)
+
+
+def _upsert_add(db: Session, model, keys, rows) -> None:
+    """Insert rows, or add their non-key values to the existing rows."""
+    values = [c for c in rows[0] if c not in keys]
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        stmt = upsert(model).values(rows)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=keys,
+            set_={c: getattr(model, c) + getattr(stmt.excluded, c) for c in values}
+        ))
+        return
+
+    for row in rows:
+        result = db.execute(
+            update(model)
+            .where(*(getattr(model, k) == row[k] for k in keys))
+            .values({c: getattr(model, c) + row[c] for c in values})
+        )
+        if result.rowcount == 0:
+            db.execute(insert(model).values(**row))
+
+
+@event.listens_for(Session, "before_commit")
+def _write_pending_rollups(session: Session) -> None:
+    pending = session.info.pop(PENDING_ROLLUPS_KEY, None)
+    if not pending:
+        return
+    flow, activity = pending
+    if flow:
+        _upsert_add(session, DailyItemFlow, ["day", "item_id", "reference_type", "movement_type"], [
+            {
+                "day": day, "item_id": item_id, "reference_type": reference_type, "movement_type": movement_type,
+                "quantity": quantity, "movements": count,
+            }
+            for (day, item_id, reference_type, movement_type), (quantity, count) in sorted(flow.items(), key=str)
+        ])
+    if activity:
+        _upsert_add(session, DailyUserActivity, ["day", "user_id", "operation"], [
+            {"day": day, "user_id": user_id, "operation": operation, "count": count}
+            for (day, user_id, operation), count in sorted(activity.items(), key=str)
+        ])
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_rollups(session: Session) -> None:
+    session.info.pop(PENDING_ROLLUPS_KEY, None)
+
+
+# (operation, date column, user column, id column) of every table that records operations
+OPERATION_SOURCES = (
+    (ReferenceType.PRODUCTION, Production.production_date, Production.produced_by_user_id, Production.id),
+    (ReferenceType.PURCHASE, Purchase.purchase_date, Purchase.received_by_user_id, Purchase.id),
+    (ReferenceType.DISTRIBUTION, Distribution.distribution_date, Distribution.distributed_by_user_id, Distribution.id),
+    (ReferenceType.ASSEMBLY, Assembly.assembly_date, Assembly.assembled_by_user_id, Assembly.id),
+)
+
+
+def rebuild_rollups(db: Session, since: Optional[date] = None) -> None:
+    """Recompute rollup rows from ``since`` (or all history) from the source tables.
+
+    On Postgres both rollup tables are locked for the duration, so writers
+    wait for the rebuild instead of having their increments overwritten.
+    The caller commits.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("LOCK TABLE daily_item_flow, daily_user_activity IN EXCLUSIVE MODE"))
+
+    since_start = datetime.combine(since, time.min) if since else None
+    for model in (DailyItemFlow, DailyUserActivity):
+        stmt = delete(model).execution_options(synchronize_session=False)
+        if since:
+            stmt = stmt.where(model.day >= since)
+        db.execute(stmt)
+
+    operation_type = DailyUserActivity.operation.type
+    sources = list(OPERATION_SOURCES) + [
+        (ReferenceType.ADJUSTMENT, StockMovement.created_at, StockMovement.user_id, StockMovement.id),
+    ]
+    for operation, date_column, user_column, id_column in sources:
+        day = func.date(date_column)
+        query = (
+            select(day, user_column, cast(literal(operation, operation_type), operation_type), func.count(id_column))
+            .group_by(day, user_column)
+        )
+        if operation == ReferenceType.ADJUSTMENT:
+            query = query.where(StockMovement.reference_type == ReferenceType.ADJUSTMENT)
+        if since:
+            query = query.where(date_column >= since_start)
+        db.execute(insert(DailyUserActivity).from_select(["day", "user_id", "operation", "count"], query))
+
+    # Movements count on their operation's date; adjustments on their own
+    joins = []
+    for operation, date_column, _, id_column in OPERATION_SOURCES:
+        source = aliased(date_column.class_)
+        joins.append((source, getattr(source, date_column.key), and_(
+            StockMovement.reference_type == operation,
+            getattr(source, id_column.key) == StockMovement.reference_id
+        )))
+    movement_date = func.coalesce(*(source_date for _, source_date, _ in joins), StockMovement.created_at)
+    day = func.date(movement_date)
+    query = select(
+        day, StockMovement.item_id, StockMovement.reference_type, StockMovement.movement_type,
+        func.sum(StockMovement.quantity), func.count(StockMovement.id)
+    ).select_from(StockMovement)
+    for source, _, onclause in joins:
+        query = query.outerjoin(source, onclause)
+    query = query.group_by(day, StockMovement.item_id, StockMovement.reference_type, StockMovement.movement_type)
+    if since:
+        query = query.where(movement_date >= since_start)
+    db.execute(insert(DailyItemFlow).from_select(
+        ["day", "item_id", "reference_type", "movement_type", "quantity", "movements"], query
+    ))
@@ -0,0 +1,257 @@
+"""Category hierarchy API routes backed by a closure table."""
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import func, select, insert, delete, literal, and_, text
+from typing import List, Optional
+import uuid
+
+from app.db.session import get_db
+from app.db.models.user import User
+from app.db.models.item import Item, Category, CategoryClosure
+from app.schemas.category import CategoryCreate, CategoryUpdate, CategoryResponse, CategoryRollup
+from app.schemas.inventory import ItemResponse
+from app.api.deps import get_current_active_user
+
+router = APIRouter()
+
+# pg_advisory_xact_lock key held by every write that reshapes the category tree
+TREE_LOCK_KEY = 0x63617467
+
+
+def _get_category(db: Session, category_id: uuid.UUID) -> Category:
+    category = db.query(Category).filter(Category.id == category_id).first()
+    if not category:
+        raise HTTPException(status_code=404, detail="Category not found")
+    return category
+
+
+def _depth(db: Session, category_id: uuid.UUID) -> int:
+    """Number of ancestors above a category."""
+    return db.query(func.max(CategoryClosure.depth)).filter(
+        CategoryClosure.descendant_id == category_id
+    ).scalar() or 0
+
+
+def _to_response(category: Category, depth: int) -> CategoryResponse:
+    return CategoryResponse(
+        id=category.id,
+        name=category.name,
+        parent_id=category.parent_id,
+        depth=depth,
+        created_at=category.created_at,
+        updated_at=category.updated_at
+    )
+
+
+def _subtree_ids(category_id: uuid.UUID):
+    """Subquery of a category and all of its descendants."""
+    return select(CategoryClosure.descendant_id).where(CategoryClosure.ancestor_id == category_id)
+
+
+def _lock_tree(db: Session) -> None:
+    """Serialize tree reshapes until this transaction ends.
+
+    Row locks on the moved category and its new parent are not enough: moves
+    of two different categories can close a longer loop (A under a
+    descendant of B while B goes under a descendant of A). On Postgres one
+    transaction-level advisory lock orders them, so the cycle check and the
+    closure rewrite always see earlier moves committed; SQLite already
+    admits one writer at a time.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": TREE_LOCK_KEY})
+
+
+def _attach(db: Session, category_id: uuid.UUID, parent_id: uuid.UUID) -> None:
+    """Link every node of category_id's subtree under parent_id and its ancestors."""
+    above = aliased(CategoryClosure)
+    below = aliased(CategoryClosure)
+    db.execute(insert(CategoryClosure).from_select(
+        ["ancestor_id", "descendant_id", "depth"],
+        select(above.ancestor_id, below.descendant_id, above.depth + below.depth + 1)
+        .where(above.descendant_id == parent_id, below.ancestor_id == category_id)
+    ))
+
+
+def _rollups(db: Session, category_id: Optional[uuid.UUID] = None) -> List[CategoryRollup]:
+    """Aggregate items over each category's subtree via the closure table."""
+    zero = literal(0)
+    query = (
+        db.query(
+            Category.id,
+            Category.name,
+            func.count(Item.id),
+            func.coalesce(func.sum(Item.current_stock_level), zero),
+            func.coalesce(func.sum(Item.current_stock_level * func.coalesce(Item.unit_cost_thb, zero)), zero),
+        )
+        .join(CategoryClosure, CategoryClosure.ancestor_id == Category.id)
+        .outerjoin(Item, and_(Item.category_id == CategoryClosure.descendant_id, Item.archived_at.is_(None)))
+        .group_by(Category.id, Category.name)
+        .order_by(Category.name, Category.id)
+    )
+    if category_id:
+        query = query.filter(Category.id == category_id)
+
+    return [
+        CategoryRollup(
+            category_id=cid,
+            name=name,
+            item_count=count,
+            total_stock=total_stock,
+            total_value_thb=total_value
+        )
+        for cid, name, count, total_stock, total_value in query.all()
+    ]
+
+
+@router.get("", response_model=List[CategoryResponse])
+def list_categories(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """List all categories with their depth in the tree."""
+    depths = (
+        select(CategoryClosure.descendant_id, func.max(CategoryClosure.depth).label("depth"))
+        .group_by(CategoryClosure.descendant_id)
+        .subquery()
+    )
+    rows = (
+        db.query(Category, depths.c.depth)
+        .outerjoin(depths, depths.c.descendant_id == Category.id)
+        .order_by(Category.name, Category.id)
+        .all()
+    )
+    return [_to_response(category, depth or 0) for category, depth in rows]
+
+
+@router.post("", response_model=CategoryResponse, status_code=status.HTTP_201_CREATED)
+def create_category(
+    body: CategoryCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Create a category, optionally under a parent."""
+    if body.parent_id:
+        _lock_tree(db)
+        _get_category(db, body.parent_id)
+
+    category = Category(name=body.name.strip(), parent_id=body.parent_id)
+    db.add(category)
+    db.flush()
+
+    db.add(CategoryClosure(ancestor_id=category.id, descendant_id=category.id, depth=0))
+    db.flush()
+    if body.parent_id:
+        _attach(db, category.id, body.parent_id)
+
+    db.commit()
+    db.refresh(category)
+    return _to_response(category, _depth(db, category.id))
+
+
+@router.patch("/{category_id}", response_model=CategoryResponse)
+def update_category(
+    category_id: uuid.UUID,
+    body: CategoryUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Rename a category or move it (with its subtree) under another parent."""
+    category = _get_category(db, category_id)
+    update_data = body.model_dump(exclude_unset=True)
+
+    if "name" in update_data and body.name is not None:
+        category.name = body.name.strip()
+
+    if "parent_id" in update_data and body.parent_id != category.parent_id:
+        new_parent_id = body.parent_id
+        _lock_tree(db)
+        if new_parent_id:
+            _get_category(db, new_parent_id)
+            in_subtree = db.query(CategoryClosure).filter(
+                CategoryClosure.ancestor_id == category_id,
+                CategoryClosure.descendant_id == new_parent_id
+            ).first()
+            if in_subtree:
+                raise HTTPException(status_code=400, detail="A category cannot be moved under itself or its descendants")
+
+        # Detach the subtree from its current ancestors, keeping its internal paths
+        subtree = _subtree_ids(category_id)
+        db.execute(
+            delete(CategoryClosure)
+            .where(CategoryClosure.descendant_id.in_(subtree), CategoryClosure.ancestor_id.notin_(subtree))
+            .execution_options(synchronize_session=False)
+        )
+        if new_parent_id:
+            _attach(db, category_id, new_parent_id)
+        category.parent_id = new_parent_id
+
+    db.commit()
+    db.refresh(category)
+    return _to_response(category, _depth(db, category.id))
+
+
+@router.delete("/{category_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_category(
+    category_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Delete an empty leaf category."""
+    category = _get_category(db, category_id)
+
+    if db.query(Category.id).filter(Category.parent_id == category_id).first():
+        raise HTTPException(status_code=400, detail="Category has subcategories")
+    if db.query(Item.id).filter(Item.category_id == category_id).first():
+        raise HTTPException(status_code=400, detail="Category still has items")
+
+    db.execute(
+        delete(CategoryClosure)
+        .where(CategoryClosure.descendant_id == category_id)
+        .execution_options(synchronize_session=False)
+    )
+    db.delete(category)
+    db.commit()
+
+    return None
+
+
+@router.get("/rollups", response_model=List[CategoryRollup])
+def list_category_rollups(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Subtree item counts, stock and value for every category in one query."""
+    return _rollups(db)
+
+
+@router.get("/{category_id}/rollup", response_model=CategoryRollup)
+def get_category_rollup(
+    category_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Item count, stock and value for a category and all of its descendants."""
+    _get_category(db, category_id)
+    return _rollups(db, category_id)[0]
+
+
+@router.get("/{category_id}/items", response_model=List[ItemResponse])
+def list_category_items(
+    category_id: uuid.UUID,
+    limit: int = Query(500, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Active items in a category or any of its descendants."""
+    _get_category(db, category_id)
+    return (
+        db.query(Item)
+        .join(CategoryClosure, CategoryClosure.descendant_id == Item.category_id)
+        .filter(CategoryClosure.ancestor_id == category_id, Item.archived_at.is_(None))
+        .order_by(Item.name, Item.id)
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
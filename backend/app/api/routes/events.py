@@ -0,0 +1,70 @@
+"""Server-Sent Events stream of live inventory activity."""
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
+from typing import Optional
+import asyncio
+import json
+
+from app.db.session import SessionLocal
+from app.api.deps import security, get_current_user
+from app.api.events import broadcaster
+
+router = APIRouter()
+
+EVENT_TYPES = {"stock", "low_stock", "operation"}
+HEARTBEAT_SECONDS = 15
+
+
+def _authenticate(credentials: HTTPAuthorizationCredentials) -> None:
+    # Uses its own short-lived session: a get_db dependency would hold a
+    # pooled connection for as long as the stream stays open
+    db = SessionLocal()
+    try:
+        get_current_user(credentials, db)
+    finally:
+        db.close()
+
+
+def _format(message: dict) -> str:
+    return f"event: {message['type']}\ndata: {json.dumps(message['data'])}\n\n"
+
+
+@router.get("")
+async def stream_events(
+    request: Request,
+    types: Optional[str] = Query(None, description="Comma-separated subset of: stock, low_stock, operation"),
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """Push stock, low-stock-crossing and new-operation events as they are committed.
+
+    An idle stream does no database work; a comment line is sent every
+    15 seconds to keep proxies from closing the connection.
+    """
+    await run_in_threadpool(_authenticate, credentials)
+    wanted = {t.strip() for t in types.split(",")} & EVENT_TYPES if types else EVENT_TYPES
+
+    queue = broadcaster.subscribe()
+
+    async def stream():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                if message["type"] in wanted:
+                    yield _format(message)
+        finally:
+            broadcaster.unsubscribe(queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
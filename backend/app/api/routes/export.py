@@ -0,0 +1,148 @@
+"""Streaming export API routes for audits (items catalog and stock ledger)."""
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterator, List, Optional
+import csv
+import enum
+import io
+import json
+import uuid
+
+from app.db.session import SessionLocal
+from app.db.models.user import User
+from app.db.models.item import Item, ItemCategory
+from app.db.models.stock_movement import StockMovement, MovementType, ReferenceType
+from app.api.deps import get_current_active_user
+
+router = APIRouter()
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_BATCH_SIZE = 2000
+
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def _plain(value):
+    """Convert a column value to a CSV/JSON friendly scalar."""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (Decimal, uuid.UUID)):
+        return str(value)
+    return value
+
+
+def _stream_rows(stmt, columns: List[str], fmt: str) -> Iterator[str]:
+    """Run stmt on a server-side cursor and yield it encoded one batch at a time.
+
+    Uses its own session so the cursor outlives the request's dependency
+    scope, and never builds ORM objects, so memory stays flat.
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if fmt == "csv":
+            writer.writerow(columns)
+        for partition in result.partitions():
+            for row in partition:
+                values = [_plain(v) for v in row]
+                if fmt == "csv":
+                    writer.writerow(values)
+                else:
+                    buffer.write(json.dumps(dict(zip(columns, values))) + "\n")
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        db.close()
+
+
+def _export_response(stmt, columns: List[str], fmt: str, name: str) -> StreamingResponse:
+    filename = f"{name}-{datetime.utcnow():%Y%m%d-%H%M%S}.{fmt}"
+    return StreamingResponse(
+        _stream_rows(stmt, columns, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get("/items")
+def export_items(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    category: Optional[ItemCategory] = None,
+    item_id: Optional[List[uuid.UUID]] = Query(None, description="Restrict to these items (repeatable)"),
+    start_date: Optional[datetime] = Query(None, description="Only items updated at or after this time"),
+    end_date: Optional[datetime] = Query(None, description="Only items updated at or before this time"),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Stream the items catalog, archived items included, as CSV or NDJSON."""
+    columns = [
+        "id", "name", "sku", "category", "category_id", "unit_of_measure", "current_stock_level",
+        "minimum_stock_level", "unit_cost_thb", "description", "notes", "archived_at", "created_at", "updated_at",
+    ]
+    stmt = select(*[getattr(Item, c) for c in columns])
+    
+    if category:
+        stmt = stmt.where(Item.category == category)
+    if item_id:
+        stmt = stmt.where(Item.id.in_(item_id))
+    if start_date:
+        stmt = stmt.where(Item.updated_at >= start_date)
+    if end_date:
+        stmt = stmt.where(Item.updated_at <= end_date)
+    
+    return _export_response(stmt.order_by(Item.name, Item.id), columns, format, "items")
+
+
+@router.get("/movements")
+def export_movements(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    item_id: Optional[List[uuid.UUID]] = Query(None, description="Restrict to these items (repeatable)"),
+    movement_type: Optional[MovementType] = None,
+    reference_type: Optional[ReferenceType] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Stream the stock movement ledger, oldest first, as CSV or NDJSON."""
+    selected = [
+        ("id", StockMovement.id),
+        ("created_at", StockMovement.created_at),
+        ("item_id", StockMovement.item_id),
+        ("item_name", Item.name),
+        ("item_sku", Item.sku),
+        ("movement_type", StockMovement.movement_type),
+        ("quantity", StockMovement.quantity),
+        ("reference_type", StockMovement.reference_type),
+        ("reference_id", StockMovement.reference_id),
+        ("user_id", StockMovement.user_id),
+        ("user_name", User.full_name),
+        ("notes", StockMovement.notes),
+    ]
+    stmt = (
+        select(*[col for _, col in selected])
+        .join(Item, Item.id == StockMovement.item_id)
+        .outerjoin(User, User.id == StockMovement.user_id)
+    )
+    
+    if item_id:
+        stmt = stmt.where(StockMovement.item_id.in_(item_id))
+    if movement_type:
+        stmt = stmt.where(StockMovement.movement_type == movement_type)
+    if reference_type:
+        stmt = stmt.where(StockMovement.reference_type == reference_type)
+    if start_date:
+        stmt = stmt.where(StockMovement.created_at >= start_date)
+    if end_date:
+        stmt = stmt.where(StockMovement.created_at <= end_date)
+    
+    stmt = stmt.order_by(StockMovement.created_at, StockMovement.id)
+    return _export_response(stmt, [name for name, _ in selected], format, "stock-movements")
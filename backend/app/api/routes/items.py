@@ -1,29 +1,89 @@
 """Items API routes."""
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy import func, and_, or_, case, literal, literal_column, insert
+from sqlalchemy.exc import IntegrityError
+from typing import Iterator, List, Optional
+from datetime import datetime
 from decimal import Decimal
+import csv
+import io
+import json
 import uuid
 
 from app.db.session import get_db
 from app.db.models.user import User
-from app.db.models.item import Item, ItemCategory
-from app.schemas.inventory import ItemCreate, ItemUpdate, ItemResponse, StockAdjustmentRequest
+from app.db.models.item import Item, ItemCategory, Category
+from app.schemas.inventory import (
+    ItemCreate, ItemUpdate, ItemResponse, ItemSearchResult, ItemImportError, ItemImportResult,
+    StockAdjustmentRequest, StockAdjustmentBatchRequest, StockAdjustmentBatchResponse, StockAdjustmentResult
+)
 from app.api.deps import get_current_active_user
+from app.api.cursor import encode_cursor, decode_cursor
+from app.api.stock import apply_stock_deltas
+from app.api.idempotency import idempotent_replay, store_idempotent_response
+from app.api.counters import item_state, is_low, track_item_change, track_items_added, track_item_renamed
+from app.api.rollups import track_rollups
+from app.api.etag import CACHE_CONTROL, catalog_version, make_etag, etag_matches, not_modified
 from app.db.models.stock_movement import StockMovement, MovementType, ReferenceType
+from app.db.models.kit_template import KitTemplate, KitTemplateComponent
+from app.db.models.production import RecipeComponent
 
 router = APIRouter()
 
 
+MAX_PAGE_SIZE = 1000
+
+
+def _parse_fields(fields: str) -> List[str]:
+    """Validate a comma-separated projection against ItemResponse fields."""
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in ItemResponse.model_fields]
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}" if unknown else "No fields requested"
+        )
+    return list(dict.fromkeys(requested))
+
+
 @router.get("", response_model=List[ItemResponse])
 def list_items(
+    request: Request,
+    response: Response,
     category: Optional[ItemCategory] = None,
     low_stock_only: bool = False,
+    include_archived: bool = Query(False, description="Also list archived items"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; enables keyset pagination"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated subset of item fields, e.g. id,name,current_stock_level"),
+    include_total: bool = Query(False, description="Return the filtered row count in X-Total-Count"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """List all items with optional filters."""
-    query = db.query(Item)
+    """List items ordered by (name, id) with optional filters.
+
+    Pages are keyset-paginated: pass ``limit`` and follow the ``X-Next-Cursor``
+    response header. Omitting both ``limit`` and ``cursor`` returns the full list.
+    Responses carry a weak ETag; a matching If-None-Match yields 304 without
+    loading any rows.
+    """
+    etag = make_etag("items", catalog_version(db), sorted(request.query_params.multi_items()))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    columns = None
+    if fields:
+        columns = _parse_fields(fields)
+        query = db.query(*[getattr(Item, f) for f in dict.fromkeys(columns + ["name", "id"])])
+    else:
+        query = db.query(Item)
+    
+    if not include_archived:
+        query = query.filter(Item.archived_at.is_(None))
     
     if category:
         query = query.filter(Item.category == category)
@@ -34,7 +94,133 @@ def list_items(
             Item.current_stock_level <= Item.minimum_stock_level
         )
     
-    return query.order_by(Item.name).all()
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if include_total:
+        total = query.with_entities(func.count(Item.id)).order_by(None).scalar()
+        headers["X-Total-Count"] = str(total or 0)
+    
+    if cursor:
+        after_name, after_id = decode_cursor(cursor, str, uuid.UUID)
+        query = query.filter(or_(
+            Item.name > after_name,
+            and_(Item.name == after_name, Item.id > after_id)
+        ))
+    
+    query = query.order_by(Item.name, Item.id)
+    
+    if limit is None and cursor is not None:
+        limit = MAX_PAGE_SIZE
+    
+    if limit is not None:
+        rows = query.limit(limit + 1).all()
+        if len(rows) > limit:
+            rows = rows[:limit]
+            headers["X-Next-Cursor"] = encode_cursor(rows[-1].name, str(rows[-1].id))
+    else:
+        rows = query.all()
+    
+    if columns is not None:
+        content = [{f: getattr(row, f) for f in columns} for row in rows]
+        # Match ItemResponse serialization, which renders Decimal as a string
+        return JSONResponse(content=jsonable_encoder(content, custom_encoder={Decimal: str}), headers=headers)
+    
+    response.headers.update(headers)
+    return rows
+
+
+# Must match the expression of ix_items_search_tsv so Postgres can use the index
+SEARCH_DOCUMENT_SQL = (
+    "to_tsvector('simple'::regconfig, coalesce(name, '') || ' ' || coalesce(sku, '') "
+    "|| ' ' || coalesce(description, '') || ' ' || coalesce(notes, ''))"
+)
+
+
+def _escape_like(q: str) -> str:
+    """Escape LIKE wildcards in q (use with escape="\\")."""
+    return q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _search_postgres(db: Session, q: str):
+    """Ranked search using pg_trgm similarity and full-text match."""
+    document = literal_column(SEARCH_DOCUMENT_SQL)
+    ts_query = func.plainto_tsquery(literal_column("'simple'::regconfig"), q)
+    pattern = f"%{_escape_like(q)}%"
+    score = (
+        func.greatest(func.similarity(Item.name, q), func.word_similarity(q, Item.name))
+        + func.ts_rank(document, ts_query)
+        + case((Item.sku.ilike(pattern, escape="\\"), 1.0), else_=0.0)
+    )
+    return db.query(Item, score.label("score")).filter(or_(
+        Item.name.op("%")(q),
+        literal(q).op("<%")(Item.name),
+        Item.sku.ilike(pattern, escape="\\"),
+        document.op("@@")(ts_query),
+    )), score
+
+
+def _search_portable(db: Session, q: str):
+    """Ranked substring search for databases without pg_trgm (e.g. SQLite)."""
+    needle = q.lower()
+    pattern = f"%{_escape_like(needle)}%"
+    name = func.lower(Item.name)
+    sku = func.lower(Item.sku)
+    text_match = or_(
+        func.lower(Item.description).like(pattern, escape="\\"),
+        func.lower(Item.notes).like(pattern, escape="\\"),
+    )
+    score = case(
+        (name == needle, 4.0),
+        (name.like(f"{_escape_like(needle)}%", escape="\\"), 3.0),
+        (name.like(pattern, escape="\\"), 2.0),
+        (sku.like(pattern, escape="\\"), 1.5),
+        else_=1.0,
+    )
+    return db.query(Item, score.label("score")).filter(or_(
+        name.like(pattern, escape="\\"),
+        sku.like(pattern, escape="\\"),
+        text_match,
+    )), score
+
+
+@router.get("/search", response_model=List[ItemSearchResult])
+def search_items(
+    q: str = Query(..., min_length=1, max_length=100, description="Name, SKU fragment or description words"),
+    category: Optional[ItemCategory] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Search active items by name, SKU, description and notes, best matches first.
+
+    On PostgreSQL this is typo-tolerant (trigram similarity) and ranked by
+    trigram and full-text relevance; other databases fall back to LIKE.
+    """
+    q = q.strip()
+    if not q:
+        raise HTTPException(status_code=400, detail="Search query must not be blank")
+    
+    if db.get_bind().dialect.name == "postgresql":
+        query, score = _search_postgres(db, q)
+    else:
+        query, score = _search_portable(db, q)
+    
+    query = query.filter(Item.archived_at.is_(None))
+    
+    if category:
+        query = query.filter(Item.category == category)
+    
+    rows = query.order_by(score.desc(), Item.name, Item.id).offset(offset).limit(limit).all()
+    
+    return [
+        ItemSearchResult(**ItemResponse.model_validate(item).model_dump(), score=float(row_score))
+        for item, row_score in rows
+    ]
+
+
+def _ensure_category(db: Session, category_id: uuid.UUID) -> None:
+    if not db.query(Category.id).filter(Category.id == category_id).first():
+        raise HTTPException(status_code=404, detail="Category not found")
 
 
 @router.post("", response_model=ItemResponse, status_code=status.HTTP_201_CREATED)
@@ -53,25 +239,233 @@ def create_item(
                 detail="SKU already exists"
             )
     
+    if item_data.category_id:
+        _ensure_category(db, item_data.category_id)
+    
     item = Item(**item_data.model_dump())
     db.add(item)
+    db.flush()
+    track_item_change(db, None, item_state(item))
     db.commit()
     db.refresh(item)
     
     return item
 
 
+@router.get("/archived", response_model=List[ItemResponse])
+def list_archived_items(
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """List archived items, most recently archived first."""
+    return (
+        db.query(Item)
+        .filter(Item.archived_at.isnot(None))
+        .order_by(Item.archived_at.desc(), Item.id)
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+
+
+IMPORT_CHUNK_SIZE = 1000
+MAX_IMPORT_ERRORS = 1000
+
+# Column order used for bulk inserts (COPY and executemany)
+IMPORT_COLUMNS = [
+    "id", "name", "description", "category", "category_id", "unit_of_measure", "current_stock_level",
+    "minimum_stock_level", "sku", "unit_cost_thb", "notes", "created_at", "updated_at",
+]
+
+
+def _iter_import_records(upload: UploadFile, fmt: str) -> Iterator[dict]:
+    """Yield raw records from a CSV or NDJSON upload without reading it whole."""
+    stream = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        for record in csv.DictReader(stream):
+            # Blank CSV cells mean "not provided"
+            yield {k.strip(): (v if v != "" else None) for k, v in record.items() if k}
+    else:
+        for line in stream:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield {"__error__": f"Invalid JSON: {e.msg}"}
+                continue
+            yield record if isinstance(record, dict) else {"__error__": "Each line must be a JSON object"}
+
+
+def _copy_value(value) -> str:
+    """Render a value for COPY ... FROM STDIN in text format."""
+    if value is None:
+        return "\\N"
+    text = str(value)
+    return text.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def _bulk_insert_items(db: Session, rows: List[dict]) -> None:
+    """Insert prepared item rows with COPY on Postgres, executemany elsewhere."""
+    if db.get_bind().dialect.name == "postgresql":
+        buffer = io.StringIO()
+        for row in rows:
+            # SQLEnum persists enum names, so write the name rather than the value
+            values = dict(row, category=row["category"].name)
+            buffer.write("\t".join(_copy_value(values[c]) for c in IMPORT_COLUMNS) + "\n")
+        buffer.seek(0)
+        statement = f"COPY items ({', '.join(IMPORT_COLUMNS)}) FROM STDIN"
+        dbapi_connection = db.connection().connection
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.copy_expert(statement, buffer)
+        except dbapi_connection.IntegrityError as e:
+            # Surface raw driver errors the same way the ORM path does
+            raise IntegrityError(statement, None, e)
+        finally:
+            cursor.close()
+    else:
+        db.execute(insert(Item), rows)
+
+
+@router.post("/import", response_model=ItemImportResult)
+def import_items(
+    file: UploadFile = File(..., description="CSV with a header row, or newline-delimited JSON"),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$", description="Defaults from the file extension"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Bulk-create items from a streamed CSV or NDJSON upload.
+
+    Rows are validated against ItemCreate and inserted in chunks; each chunk
+    checks SKU collisions with a single query and commits on its own. Invalid
+    rows are skipped and reported, valid rows are imported.
+    """
+    fmt = format or ("ndjson" if (file.filename or "").lower().endswith((".ndjson", ".jsonl")) else "csv")
+    
+    total_rows = 0
+    imported = 0
+    failed = 0
+    errors: List[ItemImportError] = []
+    seen_skus = set()
+    
+    def reject(row_number: int, sku: Optional[str], message: str) -> None:
+        nonlocal failed
+        failed += 1
+        if len(errors) < MAX_IMPORT_ERRORS:
+            errors.append(ItemImportError(row=row_number, sku=sku, error=message))
+    
+    def flush(chunk: List[tuple]) -> None:
+        nonlocal imported
+        if not chunk:
+            return
+        
+        # One set-based lookup for every SKU in the chunk
+        chunk_skus = [data.sku for _, data in chunk if data.sku]
+        taken = set()
+        if chunk_skus:
+            taken = {sku for (sku,) in db.query(Item.sku).filter(Item.sku.in_(chunk_skus))}
+        
+        chunk_categories = {data.category_id for _, data in chunk if data.category_id}
+        known_categories = set()
+        if chunk_categories:
+            known_categories = {cid for (cid,) in db.query(Category.id).filter(Category.id.in_(chunk_categories))}
+        
+        now = datetime.utcnow()
+        rows = []
+        row_numbers = []
+        for row_number, data in chunk:
+            if data.sku in taken:
+                reject(row_number, data.sku, "SKU already exists")
+                continue
+            if data.category_id and data.category_id not in known_categories:
+                reject(row_number, data.sku, "Category not found")
+                continue
+            values = data.model_dump()
+            values["current_stock_level"] = values["current_stock_level"] or Decimal("0")
+            rows.append(dict(values, id=uuid.uuid4(), created_at=now, updated_at=now))
+            row_numbers.append((row_number, data.sku))
+        
+        if not rows:
+            return
+        try:
+            _bulk_insert_items(db, rows)
+            track_items_added(db, [
+                (True, is_low(row["current_stock_level"], row["minimum_stock_level"])) for row in rows
+            ])
+            db.commit()
+            imported += len(rows)
+        except IntegrityError:
+            # A concurrent writer claimed a SKU or removed a category; fail the chunk as a unit
+            db.rollback()
+            for row_number, sku in row_numbers:
+                reject(row_number, sku, "Chunk rejected: conflict with a concurrent write")
+    
+    chunk: List[tuple] = []
+    try:
+        for record in _iter_import_records(file, fmt):
+            total_rows += 1
+            raw_sku = record.get("sku")
+            if "__error__" in record:
+                reject(total_rows, None, record["__error__"])
+                continue
+            try:
+                data = ItemCreate.model_validate(record)
+            except ValidationError as e:
+                reject(total_rows, raw_sku, "; ".join(
+                    f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+                ))
+                continue
+            if data.sku:
+                if data.sku in seen_skus:
+                    reject(total_rows, data.sku, "Duplicate SKU within upload")
+                    continue
+                seen_skus.add(data.sku)
+            chunk.append((total_rows, data))
+            if len(chunk) >= IMPORT_CHUNK_SIZE:
+                flush(chunk)
+                chunk = []
+        flush(chunk)
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Could not parse upload after row {total_rows}: {e}. {imported} rows were imported."
+        )
+    
+    return ItemImportResult(
+        total_rows=total_rows,
+        imported=imported,
+        failed=failed,
+        errors=errors,
+        errors_truncated=failed > len(errors)
+    )
+
+
 @router.get("/{item_id}", response_model=ItemResponse)
 def get_item(
     item_id: uuid.UUID,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get item by ID."""
+    """Get item by ID (supports If-None-Match)."""
+    updated_at = db.query(Item.updated_at).filter(Item.id == item_id).scalar()
+    if updated_at is None:
+        raise HTTPException(status_code=404, detail="Item not found")
+    
+    etag = make_etag("item", item_id, updated_at.isoformat())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
     item = db.query(Item).filter(Item.id == item_id).first()
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
     return item
 
 
@@ -96,10 +490,18 @@ def update_item(
                 detail="SKU already exists"
             )
     
+    if item_data.category_id and item_data.category_id != item.category_id:
+        _ensure_category(db, item_data.category_id)
+    
     # Update fields
+    before = item_state(item)
+    old_name = item.name
     update_data = item_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(item, field, value)
+    track_item_change(db, before, item_state(item))
+    if item.name != old_name:
+        track_item_renamed(db)
     
     db.commit()
     db.refresh(item)
@@ -113,27 +515,78 @@ def delete_item(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Delete an item."""
+    """Delete an item, or archive it if it has history.
+
+    Items referenced by stock movements, kit templates or recipes are archived
+    (hidden from lists and counts but still resolvable by id) so past
+    operations and reports keep their item names.
+    """
     item = db.query(Item).filter(Item.id == item_id).first()
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     
-    db.delete(item)
+    has_history = (
+        db.query(StockMovement.id).filter(StockMovement.item_id == item_id).first()
+        or db.query(KitTemplate.id).filter(KitTemplate.kit_item_id == item_id).first()
+        or db.query(KitTemplateComponent.template_id).filter(KitTemplateComponent.item_id == item_id).first()
+        or db.query(RecipeComponent.product_item_id).filter(RecipeComponent.material_item_id == item_id).first()
+    )
+    before = item_state(item)
+    if has_history:
+        if item.archived_at is None:
+            item.archived_at = datetime.utcnow()
+        track_item_change(db, before, item_state(item))
+    else:
+        db.delete(item)
+        track_item_change(db, before, None)
+        track_item_renamed(db)
     db.commit()
     
     return None
 
 
+@router.post("/{item_id}/restore", response_model=ItemResponse)
+def restore_item(
+    item_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Un-archive an item."""
+    item = db.query(Item).filter(Item.id == item_id).first()
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+    
+    before = item_state(item)
+    item.archived_at = None
+    track_item_change(db, before, item_state(item))
+    db.commit()
+    db.refresh(item)
+    
+    return item
+
+
+def _adjustment_note(delta: Decimal, reason: Optional[str]) -> str:
+    """Movement note for a manual adjustment."""
+    return reason or ("Manual adjustment +" + str(delta) if delta > 0 else "Manual adjustment " + str(delta))
+
+
 @router.post("/{item_id}/adjust", response_model=ItemResponse)
 def adjust_stock(
     item_id: uuid.UUID,
     body: StockAdjustmentRequest,
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Adjust stock by delta (positive add, negative subtract).
     Records a StockMovement of type ADJUSTMENT and prevents negative stock.
+    A retry with the same Idempotency-Key returns the original response.
     """
+    replay = idempotent_replay(db, request, idempotency_key, current_user.id, body)
+    if replay:
+        return replay
+
     item = db.query(Item).filter(Item.id == item_id).first()
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
@@ -141,13 +594,6 @@ def adjust_stock(
     if body.delta == 0:
         raise HTTPException(status_code=400, detail="Delta must be non-zero")
 
-    new_level = Decimal(item.current_stock_level) + Decimal(body.delta)
-    if new_level < 0:
-        raise HTTPException(status_code=400, detail="Resulting stock would be negative")
-
-    # Apply adjustment
-    item.current_stock_level = new_level
-
     movement = StockMovement(
         item_id=item.id,
         movement_type=MovementType.ADJUSTMENT,
@@ -155,10 +601,66 @@ def adjust_stock(
         reference_type=ReferenceType.ADJUSTMENT,
         reference_id=None,
         user_id=current_user.id,
-        notes=body.reason or ("Manual adjustment +" + str(body.delta) if body.delta > 0 else "Manual adjustment " + str(body.delta))
+        notes=_adjustment_note(body.delta, body.reason)
     )
     db.add(movement)
-    db.commit()
+    db.flush()
+    track_rollups(db, movement.created_at, current_user.id, ReferenceType.ADJUSTMENT, [movement])
+
+    # Atomic, non-negative increment (raises 400 if stock would go negative)
+    apply_stock_deltas(db, {item.id: Decimal(body.delta)})
     db.refresh(item)
+    response = ItemResponse.model_validate(item)
+    store_idempotent_response(db, idempotency_key, current_user.id, response)
+    db.commit()
 
-    return item
+    return response
+
+
+@router.post("/adjust-batch", response_model=StockAdjustmentBatchResponse)
+def adjust_stock_batch(
+    body: StockAdjustmentBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Apply many stock adjustments in one all-or-nothing transaction.
+
+    Stock levels change through the shared atomic stock layer, which refuses
+    any result below zero; if any item is missing or would go negative
+    nothing is applied. ADJUSTMENT movements are bulk-inserted.
+    """
+    deltas = {a.item_id: Decimal(a.delta) for a in body.adjustments}
+    if any(delta == 0 for delta in deltas.values()):
+        raise HTTPException(status_code=400, detail="Delta must be non-zero")
+    
+    updated = apply_stock_deltas(db, deltas)
+    
+    now = datetime.utcnow()
+    movement_rows = [
+        {
+            "id": uuid.uuid4(),
+            "item_id": a.item_id,
+            "movement_type": MovementType.ADJUSTMENT,
+            "quantity": abs(Decimal(a.delta)),
+            "reference_type": ReferenceType.ADJUSTMENT,
+            "reference_id": None,
+            "user_id": current_user.id,
+            "notes": _adjustment_note(a.delta, a.reason),
+            "created_at": now,
+        }
+        for a in body.adjustments
+    ]
+    db.execute(insert(StockMovement), movement_rows)
+    for row in movement_rows:
+        track_rollups(db, now, current_user.id, ReferenceType.ADJUSTMENT, [row])
+    db.commit()
+    
+    return StockAdjustmentBatchResponse(results=[
+        StockAdjustmentResult(
+            item_id=a.item_id,
+            name=updated[a.item_id].name,
+            delta=a.delta,
+            new_stock_level=updated[a.item_id].current_stock_level
+        )
+        for a in body.adjustments
+    ])
@@ -1,15 +1,19 @@
 """Sophisticated kit assembly API with atomic transactions and validation."""
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from typing import List
+from typing import List, Optional
+from collections import OrderedDict
 from datetime import datetime
 from decimal import Decimal
+import threading
+import uuid
 
 from app.db.session import get_db
 from app.db.models.user import User
 from app.db.models.item import Item
-from app.db.models.kit_template import KitTemplate
+from app.db.models.kit_template import KitTemplate, KitTemplateComponent
 from app.db.models.operations import Assembly
 from app.db.models.stock_movement import StockMovement, MovementType, ReferenceType
 from app.schemas.kit_assembly import (
@@ -17,63 +21,113 @@ from app.schemas.kit_assembly import (
     KitTemplateUpdate,
     KitTemplateResponse,
     AssembleKitRequest,
+    AssembleBatchRequest,
+    AssembleBatchResponse,
     AssemblyPreview,
     AssemblyResponse,
     KitComponentResponse,
-    ComponentAvailability
+    ComponentAvailability,
+    KitCapacity,
+    KitPlanRequest,
+    KitPlanResponse,
+    KitPlanAllocation,
+    KitPlanComponent
 )
 from app.api.deps import get_current_active_user
+from app.api.stock import apply_stock_deltas
+from app.api.idempotency import idempotent_replay, store_idempotent_response
+from app.api.counters import counter_value, ITEM_NAMES_VERSION
+from app.api.kit_planner import solve_kit_plan
+from app.api.events import queue_event
+from app.api.rollups import track_rollups
 
 router = APIRouter()
 
+# Compiled template responses: template id -> (updated_at, item-names version, response)
+TEMPLATE_CACHE_SIZE = 1000
+_template_cache: "OrderedDict[uuid.UUID, tuple]" = OrderedDict()
+_template_cache_lock = threading.Lock()
+
+
+def _template_responses(db: Session, templates: List[KitTemplate]) -> List[KitTemplateResponse]:
+    """Build template responses, resolving all kit and component names in one query.
+    
+    Responses are cached per template and reused while both the template's
+    updated_at and the item-names version are unchanged.
+    """
+    names_version = counter_value(db, ITEM_NAMES_VERSION)
+    
+    responses = {}
+    misses = []
+    with _template_cache_lock:
+        for template in templates:
+            cached = _template_cache.get(template.id)
+            if cached and cached[0] == template.updated_at and cached[1] == names_version:
+                _template_cache.move_to_end(template.id)
+                responses[template.id] = cached[2]
+            else:
+                misses.append(template)
+    
+    if misses:
+        item_ids = {t.kit_item_id for t in misses}
+        item_ids.update(c.item_id for t in misses for c in t.components)
+        names = {str(item_id): name for item_id, name in db.query(Item.id, Item.name).filter(Item.id.in_(item_ids))}
+        
+        for template in misses:
+            responses[template.id] = KitTemplateResponse(
+                id=template.id,
+                name=template.name,
+                description=template.description,
+                kit_item_id=template.kit_item_id,
+                kit_item_name=names.get(str(template.kit_item_id), "Unknown"),
+                components=[
+                    KitComponentResponse(
+                        item_id=str(comp.item_id),
+                        item_name=names.get(str(comp.item_id), "Unknown"),
+                        quantity=comp.quantity
+                    )
+                    for comp in template.components
+                ],
+                is_active=template.is_active,
+                created_by_user_id=template.created_by_user_id,
+                created_at=template.created_at,
+                updated_at=template.updated_at
+            )
+        
+        with _template_cache_lock:
+            for template in misses:
+                _template_cache[template.id] = (template.updated_at, names_version, responses[template.id])
+                _template_cache.move_to_end(template.id)
+            while len(_template_cache) > TEMPLATE_CACHE_SIZE:
+                _template_cache.popitem(last=False)
+    
+    return [responses[t.id] for t in templates]
+
 
 @router.get("/templates", response_model=List[KitTemplateResponse])
 def list_kit_templates(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
-    include_inactive: bool = False
+    include_inactive: bool = False,
+    item_id: Optional[uuid.UUID] = None
 ):
-    # Ensure table exists (safety in case migrations haven't run)
-    try:
-        KitTemplate.__table__.create(bind=db.get_bind(), checkfirst=True)
-    except Exception:
-        pass
-    """List all kit templates."""
+    """List all kit templates, optionally only those using item_id as a component.
+    
+    Uses a fixed number of queries however many templates and components
+    there are: templates, their components, the item-names version, and
+    one IN query for the names of templates not already in the response cache.
+    """
     query = db.query(KitTemplate)
     
+    if item_id:
+        query = query.join(KitTemplateComponent).filter(KitTemplateComponent.item_id == item_id)
+    
     if not include_inactive:
         query = query.filter(KitTemplate.is_active == True)
     
     templates = query.order_by(KitTemplate.name).all()
     
-    # Enrich with item names
-    result = []
-    for template in templates:
-        kit_item = db.query(Item).filter(Item.id == template.kit_item_id).first()
-        
-        components = []
-        for comp in template.components:
-            item = db.query(Item).filter(Item.id == comp["item_id"]).first()
-            components.append(KitComponentResponse(
-                item_id=comp["item_id"],
-                item_name=item.name if item else "Unknown",
-                quantity=comp["quantity"]
-            ))
-        
-        result.append(KitTemplateResponse(
-            id=template.id,
-            name=template.name,
-            description=template.description,
-            kit_item_id=template.kit_item_id,
-            kit_item_name=kit_item.name if kit_item else "Unknown",
-            components=components,
-            is_active=template.is_active,
-            created_by_user_id=template.created_by_user_id,
-            created_at=template.created_at,
-            updated_at=template.updated_at
-        ))
-    
-    return result
+    return _template_responses(db, templates)
 
 
 @router.post("/templates", response_model=KitTemplateResponse, status_code=status.HTTP_201_CREATED)
@@ -82,11 +136,6 @@ def create_kit_template(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    # Ensure table exists (safety in case migrations haven't run)
-    try:
-        KitTemplate.__table__.create(bind=db.get_bind(), checkfirst=True)
-    except Exception:
-        pass
     """Create a new kit template with validation."""
     # Verify kit item exists and is category 'assembled_kit'
     kit_item = db.query(Item).filter(Item.id == template_data.kit_item_id).first()
@@ -119,22 +168,15 @@ def create_kit_template(
                 detail=f"Component '{comp_item.name}' cannot be an assembled kit. Kits cannot contain other kits."
             )
     
-    # Build components JSON with item names for display
-    components_json = []
-    for comp_input in template_data.components:
-        item = next((c for c in components if str(c.id) == str(comp_input.item_id)), None)
-        components_json.append({
-            "item_id": str(comp_input.item_id),
-            "item_name": item.name if item else "Unknown",
-            "quantity": comp_input.quantity
-        })
-    
     # Create template
     template = KitTemplate(
         name=template_data.name,
         description=template_data.description,
         kit_item_id=template_data.kit_item_id,
-        components=components_json,
+        components=[
+            KitTemplateComponent(item_id=comp_input.item_id, quantity=comp_input.quantity, position=position)
+            for position, comp_input in enumerate(template_data.components)
+        ],
         created_by_user_id=current_user.id
     )
     
@@ -147,13 +189,17 @@ def create_kit_template(
         raise HTTPException(status_code=400, detail=f"Database error: {str(e)}")
     
     # Return with proper response format
+    names = {c.id: c.name for c in components}
     return KitTemplateResponse(
         id=template.id,
         name=template.name,
         description=template.description,
         kit_item_id=template.kit_item_id,
         kit_item_name=kit_item.name,
-        components=[KitComponentResponse(**c) for c in components_json],
+        components=[
+            KitComponentResponse(item_id=str(c.item_id), item_name=names[c.item_id], quantity=c.quantity)
+            for c in template.components
+        ],
         is_active=template.is_active,
         created_by_user_id=template.created_by_user_id,
         created_at=template.created_at,
@@ -172,28 +218,148 @@ def get_kit_template(
     if not template:
         raise HTTPException(status_code=404, detail="Kit template not found")
     
-    kit_item = db.query(Item).filter(Item.id == template.kit_item_id).first()
+    return _template_responses(db, [template])[0]
+
+
+def _component_stock(db: Session, templates: List[KitTemplate]) -> dict:
+    """(name, current stock) for every kit and component item, keyed by str id, in one query."""
+    item_ids = {t.kit_item_id for t in templates}
+    item_ids.update(c.item_id for t in templates for c in t.components)
+    if not item_ids:
+        return {}
+    return {
+        str(item_id): (name, level or Decimal(0))
+        for item_id, name, level in db.query(Item.id, Item.name, Item.current_stock_level).filter(Item.id.in_(item_ids))
+    }
+
+
+def _max_kits(template: KitTemplate, stock: dict):
+    """(max kits, limiting component id) for a template given current stock.
     
-    components = []
+    The limit is the smallest floor(available / per-kit quantity) over its
+    components; a missing component allows none.
+    """
+    best = None
+    limiting = None
     for comp in template.components:
-        item = db.query(Item).filter(Item.id == comp["item_id"]).first()
-        components.append(KitComponentResponse(
-            item_id=comp["item_id"],
-            item_name=item.name if item else comp.get("item_name", "Unknown"),
-            quantity=comp["quantity"]
+        item_id = str(comp.item_id)
+        available = stock[item_id][1] if item_id in stock else Decimal(0)
+        kits = max(int(available // comp.quantity), 0)
+        if best is None or kits < best:
+            best, limiting = kits, item_id
+    return best or 0, limiting
+
+
+@router.get("/capacity", response_model=List[KitCapacity])
+def get_kit_capacity(
+    include_inactive: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Maximum number of kits each template could assemble from current stock.
+    
+    Each template is evaluated on its own (templates sharing a component
+    each see its full stock). Two queries in total: templates, then stock
+    for every item they reference.
+    """
+    query = db.query(KitTemplate)
+    if not include_inactive:
+        query = query.filter(KitTemplate.is_active == True)
+    templates = query.order_by(KitTemplate.name).all()
+    stock = _component_stock(db, templates)
+    
+    result = []
+    for template in templates:
+        max_kits, limiting_id = _max_kits(template, stock)
+        limiting = next((c for c in template.components if str(c.item_id) == limiting_id), None)
+        result.append(KitCapacity(
+            template_id=template.id,
+            template_name=template.name,
+            kit_item_id=template.kit_item_id,
+            kit_item_name=stock.get(str(template.kit_item_id), ("Unknown",))[0],
+            max_kits=max_kits,
+            limiting_item_id=limiting_id,
+            limiting_item_name=stock[limiting_id][0] if limiting_id in stock else None,
+            limiting_available=float(stock[limiting_id][1]) if limiting_id in stock else (0.0 if limiting_id else None),
+            limiting_per_kit=limiting.quantity if limiting else None
         ))
     
-    return KitTemplateResponse(
-        id=template.id,
-        name=template.name,
-        description=template.description,
-        kit_item_id=template.kit_item_id,
-        kit_item_name=kit_item.name if kit_item else "Unknown",
-        components=components,
-        is_active=template.is_active,
-        created_by_user_id=template.created_by_user_id,
-        created_at=template.created_at,
-        updated_at=template.updated_at
+    return result
+
+
+@router.post("/plan", response_model=KitPlanResponse)
+def plan_assembly(
+    plan_request: KitPlanRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Best mix of kits to assemble from current stock when templates share components.
+    
+    Maximizes the total weight of planned kits (each template's weight
+    times its kits) without exceeding any component's stock or any target,
+    and reports per-component use and the shortfall against the targets.
+    Nothing is changed; assemble the planned quantities afterwards.
+    """
+    requested = {t.kit_template_id: t for t in plan_request.templates}
+    templates = db.query(KitTemplate).filter(
+        KitTemplate.id.in_(list(requested)),
+        KitTemplate.is_active == True
+    ).all()
+    if len(templates) != len(requested):
+        raise HTTPException(status_code=404, detail="One or more kit templates not found or inactive")
+    
+    stock = _component_stock(db, templates)
+    recipes = {t.id: [(str(c.item_id), c.quantity) for c in t.components] for t in templates}
+    whole_units = {item_id: int(level) for item_id, (_, level) in stock.items()}
+    caps = {}
+    for template in templates:
+        max_kits, _ = _max_kits(template, stock)
+        target = requested[template.id].target
+        caps[template.id] = max_kits if target is None else min(target, max_kits)
+    
+    plan = solve_kit_plan(
+        recipes, whole_units, {t: requested[t].weight for t in recipes}, caps
+    )
+    
+    used = {}
+    required = {}
+    for template_id, recipe in recipes.items():
+        target = requested[template_id].target
+        goal = plan[template_id] if target is None else target
+        for item_id, per_kit in recipe:
+            used[item_id] = used.get(item_id, 0) + per_kit * plan[template_id]
+            required[item_id] = required.get(item_id, 0) + per_kit * goal
+    
+    components = []
+    for item_id in sorted(used, key=lambda i: stock.get(i, ("Unknown",))[0]):
+        name, available = stock.get(item_id, ("Unknown", Decimal(0)))
+        components.append(KitPlanComponent(
+            item_id=item_id,
+            item_name=name,
+            available=float(available),
+            used=used[item_id],
+            remaining=float(available - used[item_id]),
+            required_for_targets=required[item_id],
+            shortfall=float(max(required[item_id] - available, 0))
+        ))
+    
+    allocations = [
+        KitPlanAllocation(
+            kit_template_id=template.id,
+            template_name=template.name,
+            target=requested[template.id].target,
+            weight=requested[template.id].weight,
+            planned=plan[template.id],
+            unmet=None if requested[template.id].target is None else requested[template.id].target - plan[template.id]
+        )
+        for template in sorted(templates, key=lambda t: t.name)
+    ]
+    
+    return KitPlanResponse(
+        allocations=allocations,
+        total_kits=sum(plan.values()),
+        total_weight=sum(a.weight * a.planned for a in allocations),
+        components=components
     )
 
 
@@ -217,12 +383,16 @@ def preview_assembly(
     can_assemble = True
     insufficient_items = []
     
+    items = {
+        item.id: item
+        for item in db.query(Item).filter(Item.id.in_([c.item_id for c in template.components]))
+    }
     for comp in template.components:
-        item = db.query(Item).filter(Item.id == comp["item_id"]).first()
+        item = items.get(comp.item_id)
         if not item:
             continue
         
-        required = comp["quantity"] * assembly_data.quantity
+        required = comp.quantity * assembly_data.quantity
         available = float(item.current_stock_level)
         sufficient = available >= required
         
@@ -250,6 +420,8 @@ def preview_assembly(
 @router.post("/assemble", response_model=AssemblyResponse, status_code=status.HTTP_201_CREATED)
 def assemble_kits(
     assembly_data: AssembleKitRequest,
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
@@ -262,7 +434,12 @@ def assemble_kits(
     - Complete audit trail via stock movements
     - Prevents negative inventory
     - Handles concurrent access safely
+    - Retries with the same Idempotency-Key return the original response
     """
+    replay = idempotent_replay(db, request, idempotency_key, current_user.id, assembly_data)
+    if replay:
+        return replay
+    
     # Get and validate template
     template = db.query(KitTemplate).filter(
         KitTemplate.id == assembly_data.kit_template_id,
@@ -279,12 +456,16 @@ def assemble_kits(
     
     # Calculate total requirements and validate stock
     components_to_deduct = []
+    items = {
+        item.id: item
+        for item in db.query(Item).filter(Item.id.in_([c.item_id for c in template.components]))
+    }
     for comp in template.components:
-        item = db.query(Item).filter(Item.id == comp["item_id"]).first()
+        item = items.get(comp.item_id)
         if not item:
-            raise HTTPException(status_code=404, detail=f"Component item {comp['item_id']} not found")
+            raise HTTPException(status_code=404, detail=f"Component item {comp.item_id} not found")
         
-        required_total = Decimal(str(comp["quantity"] * assembly_data.quantity))
+        required_total = Decimal(str(comp.quantity * assembly_data.quantity))
         
         if item.current_stock_level < required_total:
             raise HTTPException(
@@ -308,7 +489,7 @@ def assemble_kits(
             component_items=[{
                 "item_id": c["item_id"],
                 "item_name": c["item_name"],
-                "quantity_per_kit": comp["quantity"],
+                "quantity_per_kit": comp.quantity,
                 "total_used": float(c["quantity"])
             } for c, comp in zip(components_to_deduct, template.components)],
             assembled_by_user_id=current_user.id,
@@ -317,10 +498,10 @@ def assemble_kits(
         db.add(assembly)
         db.flush()  # Get assembly ID
         
-        # Deduct components from inventory
+        # Record component usage
+        movements = []
         for comp_data in components_to_deduct:
             item = comp_data["item"]
-            item.current_stock_level -= comp_data["quantity"]
             
             # Create stock movement
             movement = StockMovement(
@@ -332,10 +513,7 @@ def assemble_kits(
                 user_id=current_user.id,
                 notes=f"Used in assembling {assembly_data.quantity} x {template.name}"
             )
-            db.add(movement)
-        
-        # Add assembled kits to inventory
-        kit_item.current_stock_level += Decimal(str(assembly_data.quantity))
+            movements.append(movement)
         
         # Create stock movement for assembled kits
         kit_movement = StockMovement(
@@ -347,13 +525,20 @@ def assemble_kits(
             user_id=current_user.id,
             notes=f"Assembled {assembly_data.quantity} kits from template: {template.name}"
         )
-        db.add(kit_movement)
+        movements.append(kit_movement)
+        db.add_all(movements)
+        db.flush()
         
-        # Commit all changes atomically
-        db.commit()
-        db.refresh(assembly)
+        track_rollups(db, assembly.assembly_date, current_user.id, ReferenceType.ASSEMBLY, movements)
+        queue_event(db, "operation", {"kind": "assembly", "id": assembly.id, "date": assembly.assembly_date})
+        
+        # Deduct components and add kits atomically; re-checks stock under row locks
+        deltas = {c["item"].id: -c["quantity"] for c in components_to_deduct}
+        deltas[kit_item.id] = deltas.get(kit_item.id, 0) + Decimal(str(assembly_data.quantity))
+        apply_stock_deltas(db, deltas)
         
-        return AssemblyResponse(
+        db.refresh(assembly)
+        response = AssemblyResponse(
             id=assembly.id,
             assembly_date=assembly.assembly_date,
             kit_type_item_id=assembly.kit_type_item_id,
@@ -364,12 +549,168 @@ def assemble_kits(
             notes=assembly.notes,
             created_at=assembly.created_at
         )
+        store_idempotent_response(db, idempotency_key, current_user.id, response, status.HTTP_201_CREATED)
         
+        # Commit all changes atomically
+        db.commit()
+        
+        return response
+        
+    except HTTPException:
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Assembly failed: {str(e)}")
 
 
+def assembly_rows_for(
+    template: KitTemplate,
+    assembly_data: AssembleKitRequest,
+    names: dict,
+    user_id: uuid.UUID,
+    now: datetime
+):
+    """Assembly row and its StockMovement rows, ready for a bulk insert.
+    
+    ``names`` maps component item ids to their names.
+    """
+    assembly_id = uuid.uuid4()
+    assembly_row = {
+        "id": assembly_id,
+        "assembly_date": now,
+        "kit_type_item_id": template.kit_item_id,
+        "quantity_assembled": Decimal(assembly_data.quantity),
+        "component_items": [{
+            "item_id": str(comp.item_id),
+            "item_name": names.get(comp.item_id, "Unknown"),
+            "quantity_per_kit": comp.quantity,
+            "total_used": float(comp.quantity * assembly_data.quantity)
+        } for comp in template.components],
+        "assembled_by_user_id": user_id,
+        "notes": assembly_data.notes,
+        "created_at": now,
+    }
+    movement_rows = [{
+        "id": uuid.uuid4(),
+        "item_id": comp.item_id,
+        "movement_type": MovementType.OUT,
+        "quantity": Decimal(comp.quantity * assembly_data.quantity),
+        "reference_type": ReferenceType.ASSEMBLY,
+        "reference_id": assembly_id,
+        "user_id": user_id,
+        "notes": f"Used in assembling {assembly_data.quantity} x {template.name}",
+    } for comp in template.components]
+    movement_rows.append({
+        "id": uuid.uuid4(),
+        "item_id": template.kit_item_id,
+        "movement_type": MovementType.IN,
+        "quantity": Decimal(assembly_data.quantity),
+        "reference_type": ReferenceType.ASSEMBLY,
+        "reference_id": assembly_id,
+        "user_id": user_id,
+        "notes": f"Assembled {assembly_data.quantity} kits from template: {template.name}",
+    })
+    return assembly_row, movement_rows
+
+
+@router.post("/assemble-batch", response_model=AssembleBatchResponse, status_code=status.HTTP_201_CREATED)
+def assemble_kits_batch(
+    batch: AssembleBatchRequest,
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Assemble several kit templates in one all-or-nothing transaction.
+    
+    Component demand is summed across all requested assemblies, every
+    affected item is locked once in id order and checked in the same
+    query, and the Assembly and StockMovement rows are bulk-inserted.
+    If any component is short, nothing is assembled and every shortfall
+    is reported. Retries with the same Idempotency-Key return the original
+    response.
+    """
+    replay = idempotent_replay(db, request, idempotency_key, current_user.id, batch)
+    if replay:
+        return replay
+    
+    template_ids = {a.kit_template_id for a in batch.assemblies}
+    templates = {
+        t.id: t
+        for t in db.query(KitTemplate).filter(KitTemplate.id.in_(template_ids), KitTemplate.is_active == True)
+    }
+    if len(templates) != len(template_ids):
+        raise HTTPException(status_code=404, detail="One or more kit templates not found or inactive")
+    
+    # Net stock change per item over the whole batch
+    deltas = {}
+    for assembly_data in batch.assemblies:
+        template = templates[assembly_data.kit_template_id]
+        for comp in template.components:
+            deltas[comp.item_id] = deltas.get(comp.item_id, 0) - comp.quantity * assembly_data.quantity
+        deltas[template.kit_item_id] = deltas.get(template.kit_item_id, 0) + assembly_data.quantity
+    
+    items = {
+        row.id: row
+        for row in db.execute(
+            select(Item.id, Item.name, Item.current_stock_level)
+            .where(Item.id.in_(sorted(deltas)))
+            .order_by(Item.id)
+            .with_for_update(key_share=True)
+        )
+    }
+    missing = [str(item_id) for item_id in deltas if item_id not in items]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Items not found: {', '.join(missing)}")
+    
+    shortfalls = [
+        f"{items[item_id].name} (required {-delta}, available {items[item_id].current_stock_level})"
+        for item_id, delta in deltas.items()
+        if items[item_id].current_stock_level + delta < 0
+    ]
+    if shortfalls:
+        raise HTTPException(status_code=400, detail="Insufficient stock for " + "; ".join(shortfalls))
+    
+    now = datetime.utcnow()
+    names = {item_id: row.name for item_id, row in items.items()}
+    assembly_rows = []
+    movement_rows = []
+    for assembly_data in batch.assemblies:
+        assembly_row, rows = assembly_rows_for(
+            templates[assembly_data.kit_template_id], assembly_data, names, current_user.id, now
+        )
+        assembly_rows.append(assembly_row)
+        movement_rows.extend(rows)
+        track_rollups(db, now, current_user.id, ReferenceType.ASSEMBLY, rows)
+        queue_event(db, "operation", {"kind": "assembly", "id": assembly_row["id"], "date": now})
+    
+    db.execute(insert(Assembly), assembly_rows)
+    db.execute(insert(StockMovement), movement_rows)
+    apply_stock_deltas(db, {item_id: Decimal(delta) for item_id, delta in deltas.items()}, locked=True)
+    
+    response = AssembleBatchResponse(
+        assemblies=[
+            AssemblyResponse(
+                id=row["id"],
+                assembly_date=row["assembly_date"],
+                kit_type_item_id=row["kit_type_item_id"],
+                kit_name=items[row["kit_type_item_id"]].name,
+                quantity_assembled=row["quantity_assembled"],
+                components_used=row["component_items"],
+                assembled_by_user_id=row["assembled_by_user_id"],
+                notes=row["notes"],
+                created_at=row["created_at"]
+            )
+            for row in assembly_rows
+        ],
+        total_kits=sum(a.quantity for a in batch.assemblies)
+    )
+    store_idempotent_response(db, idempotency_key, current_user.id, response, status.HTTP_201_CREATED)
+    db.commit()
+    
+    return response
+
+
 @router.get("/assemblies", response_model=List[AssemblyResponse])
 def list_assemblies(
     db: Session = Depends(get_db),
@@ -1,14 +1,17 @@
 """Quick entry API routes for dashboard operations."""
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
+from sqlalchemy import func, and_, or_, select
 from datetime import datetime
-from typing import List
+from decimal import Decimal
+from typing import Dict, List, Optional
+import uuid
 
 from app.db.session import get_db
 from app.db.models.user import User
 from app.db.models.item import Item
-from app.db.models.production import Production
-from app.db.models.operations import Purchase, Distribution
+from app.db.models.production import Production, RecipeComponent
+from app.db.models.operations import Purchase, PurchaseLine, Distribution, DistributionLine
 from app.db.models.stock_movement import StockMovement, MovementType, ReferenceType
 from app.schemas.inventory import (
     QuickProductionEntry,
@@ -17,73 +20,96 @@ from app.schemas.inventory import (
     ProductionResponse,
     PurchaseResponse,
     DistributionResponse,
-    DashboardStats
+    DashboardStats,
+    ActivityEntry,
+    QuickSyncRequest,
+    QuickSyncResponse,
+    SyncEntryResult
 )
 from app.api.deps import get_current_active_user
+from app.api.cursor import encode_cursor, decode_cursor
+from app.api.stock import apply_stock_deltas
+from app.api.idempotency import idempotent_replay, store_idempotent_response
+from app.api.events import queue_event
+from app.api.rollups import track_rollups
+from app.api.counters import bump, day_counter, track_operation, dashboard_counts, PRODUCTIONS, DISTRIBUTIONS
 
 router = APIRouter()
 
 
-@router.post("/production", response_model=ProductionResponse, status_code=status.HTTP_201_CREATED)
-def create_quick_production(
-    entry: QuickProductionEntry,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
-):
-    """Quick entry for production (used on dashboard)."""
-    # Verify item exists
-    item = db.query(Item).filter(Item.id == entry.produced_item_id).first()
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
+MATERIAL_QUANTUM = Decimal("0.01")  # stock levels and movements are Numeric(10, 2)
+
+
+def _load_recipes(db: Session, product_ids) -> Dict[uuid.UUID, list]:
+    """Recipe lines (material id, material name, quantity per unit) per product, in one query."""
+    if not product_ids:
+        return {}
+    rows = (
+        db.query(RecipeComponent.product_item_id, RecipeComponent.material_item_id, Item.name, RecipeComponent.quantity_per_unit)
+        .join(Item, Item.id == RecipeComponent.material_item_id)
+        .filter(RecipeComponent.product_item_id.in_(list(product_ids)))
+        .order_by(Item.name)
+        .all()
+    )
+    recipes = {}
+    for product_id, material_id, material_name, per_unit in rows:
+        recipes.setdefault(product_id, []).append((material_id, material_name, per_unit))
+    return recipes
+
+
+def _build_production(entry: QuickProductionEntry, user_id: uuid.UUID, recipe=()):
+    """Production record, its movements and stock deltas (not yet added to the session).
     
-    # Create production record
+    ``recipe`` lines from _load_recipes are consumed in proportion to the
+    quantity produced.
+    """
     production = Production(
+        id=uuid.uuid4(),
         production_date=entry.production_date or datetime.utcnow(),
         produced_item_id=entry.produced_item_id,
         quantity_produced=entry.quantity_produced,
-        produced_by_user_id=current_user.id,
+        produced_by_user_id=user_id,
         notes=entry.notes
     )
-    db.add(production)
-    db.flush()
-    
-    # Update stock level
-    item.current_stock_level += entry.quantity_produced
-    
-    # Create stock movement
-    movement = StockMovement(
+    movements = [StockMovement(
         item_id=entry.produced_item_id,
         movement_type=MovementType.IN,
         quantity=entry.quantity_produced,
         reference_type=ReferenceType.PRODUCTION,
         reference_id=production.id,
-        user_id=current_user.id,
+        user_id=user_id,
         notes=entry.notes
-    )
-    db.add(movement)
+    )]
+    deltas = {entry.produced_item_id: entry.quantity_produced}
     
-    db.commit()
-    db.refresh(production)
+    raw_materials_used = []
+    for material_id, material_name, per_unit in recipe:
+        quantity = (per_unit * entry.quantity_produced).quantize(MATERIAL_QUANTUM)
+        if not quantity:
+            continue
+        deltas[material_id] = deltas.get(material_id, 0) - quantity
+        raw_materials_used.append({
+            "item_id": str(material_id),
+            "item_name": material_name,
+            "quantity_per_unit": float(per_unit),
+            "quantity": float(quantity)
+        })
+        movements.append(StockMovement(
+            item_id=material_id,
+            movement_type=MovementType.OUT,
+            quantity=quantity,
+            reference_type=ReferenceType.PRODUCTION,
+            reference_id=production.id,
+            user_id=user_id,
+            notes=f"Used in producing {entry.quantity_produced} units"
+        ))
+    production.raw_materials_used = raw_materials_used or None
     
-    return production
+    return production, movements, deltas
 
 
-@router.post("/purchase", response_model=PurchaseResponse, status_code=status.HTTP_201_CREATED)
-def create_quick_purchase(
-    entry: QuickPurchaseEntry,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
-):
-    """Quick entry for purchases (used on dashboard)."""
-    # Verify all items exist
-    item_ids = [item.item_id for item in entry.items]
-    items = db.query(Item).filter(Item.id.in_(item_ids)).all()
-    
-    if len(items) != len(item_ids):
-        raise HTTPException(status_code=404, detail="One or more items not found")
-    
-    items_dict = {str(item.id): item for item in items}
-    
+def _build_purchase(entry: QuickPurchaseEntry, user_id: uuid.UUID):
+    """Purchase record, its movements and stock deltas (not yet added to the session)."""
     # Calculate total cost
     total_cost = sum(
         (item.quantity * (item.unit_cost or 0)) for item in entry.items
@@ -99,64 +125,43 @@ def create_quick_purchase(
         for item in entry.items
     ]
     
-    # Create purchase record
     purchase = Purchase(
+        id=uuid.uuid4(),
         purchase_date=entry.purchase_date or datetime.utcnow(),
         supplier_name=entry.supplier_name,
         items_purchased=items_purchased_json,
         total_cost=total_cost if total_cost > 0 else None,
-        received_by_user_id=current_user.id,
+        received_by_user_id=user_id,
         notes=entry.notes
     )
-    db.add(purchase)
-    db.flush()
+    purchase.lines = [
+        PurchaseLine(
+            line_no=line_no,
+            item_id=item.item_id,
+            purchase_date=purchase.purchase_date,
+            quantity=item.quantity,
+            unit_cost=item.unit_cost
+        )
+        for line_no, item in enumerate(entry.items)
+    ]
     
-    # Update stock levels and create movements
+    movements = []
+    deltas = {}
     for purchase_item in entry.items:
-        item = items_dict[str(purchase_item.item_id)]
-        item.current_stock_level += purchase_item.quantity
-        
-        movement = StockMovement(
+        deltas[purchase_item.item_id] = deltas.get(purchase_item.item_id, 0) + purchase_item.quantity
+        movements.append(StockMovement(
             item_id=purchase_item.item_id,
             movement_type=MovementType.IN,
             quantity=purchase_item.quantity,
             reference_type=ReferenceType.PURCHASE,
             reference_id=purchase.id,
-            user_id=current_user.id
-        )
-        db.add(movement)
-    
-    db.commit()
-    db.refresh(purchase)
-    
-    return purchase
+            user_id=user_id
+        ))
+    return purchase, movements, deltas
 
 
-@router.post("/distribution", response_model=DistributionResponse, status_code=status.HTTP_201_CREATED)
-def create_quick_distribution(
-    entry: QuickDistributionEntry,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
-):
-    """Quick entry for distributions (used on dashboard)."""
-    # Verify all items exist and have sufficient stock
-    item_ids = [item.item_id for item in entry.items]
-    items = db.query(Item).filter(Item.id.in_(item_ids)).all()
-    
-    if len(items) != len(item_ids):
-        raise HTTPException(status_code=404, detail="One or more items not found")
-    
-    items_dict = {str(item.id): item for item in items}
-    
-    # Check stock levels
-    for dist_item in entry.items:
-        item = items_dict[str(dist_item.item_id)]
-        if item.current_stock_level < dist_item.quantity:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Insufficient stock for {item.name}. Available: {item.current_stock_level}, Requested: {dist_item.quantity}"
-            )
-    
+def _build_distribution(entry: QuickDistributionEntry, user_id: uuid.UUID):
+    """Distribution record, its movements and stock deltas (not yet added to the session)."""
     # Prepare items_distributed JSON
     items_distributed_json = [
         {
@@ -166,105 +171,360 @@ def create_quick_distribution(
         for item in entry.items
     ]
     
-    # Create distribution record
     distribution = Distribution(
+        id=uuid.uuid4(),
         distribution_date=entry.distribution_date or datetime.utcnow(),
         distribution_type=entry.distribution_type,
         items_distributed=items_distributed_json,
         recipient_info=entry.recipient_info,
-        distributed_by_user_id=current_user.id,
+        distributed_by_user_id=user_id,
         notes=entry.notes
     )
-    db.add(distribution)
-    db.flush()
+    distribution.lines = [
+        DistributionLine(
+            line_no=line_no,
+            item_id=item.item_id,
+            distribution_date=distribution.distribution_date,
+            quantity=item.quantity
+        )
+        for line_no, item in enumerate(entry.items)
+    ]
     
-    # Update stock levels and create movements
+    movements = []
+    deltas = {}
     for dist_item in entry.items:
-        item = items_dict[str(dist_item.item_id)]
-        item.current_stock_level -= dist_item.quantity
-        
-        movement = StockMovement(
+        deltas[dist_item.item_id] = deltas.get(dist_item.item_id, 0) - dist_item.quantity
+        movements.append(StockMovement(
             item_id=dist_item.item_id,
             movement_type=MovementType.OUT,
             quantity=dist_item.quantity,
             reference_type=ReferenceType.DISTRIBUTION,
             reference_id=distribution.id,
-            user_id=current_user.id
-        )
-        db.add(movement)
+            user_id=user_id
+        ))
+    return distribution, movements, deltas
+
+
+@router.post("/production", response_model=ProductionResponse, status_code=status.HTTP_201_CREATED)
+def create_quick_production(
+    entry: QuickProductionEntry,
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Quick entry for production (used on dashboard).
+    
+    If the item has a recipe, its raw materials are deducted in the same
+    transaction; the stock check for all of them is one conditional update.
+    """
+    replay = idempotent_replay(db, request, idempotency_key, current_user.id, entry)
+    if replay:
+        return replay
+    
+    # Verify item exists
+    item = db.query(Item.id).filter(Item.id == entry.produced_item_id).first()
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+    
+    recipe = _load_recipes(db, [entry.produced_item_id]).get(entry.produced_item_id, []) if entry.consume_materials else []
+    production, movements, deltas = _build_production(entry, current_user.id, recipe)
+    db.add(production)
+    db.add_all(movements)
+    db.flush()
+    
+    track_operation(db, PRODUCTIONS, production.production_date)
+    track_rollups(db, production.production_date, current_user.id, ReferenceType.PRODUCTION, movements)
+    queue_event(db, "operation", {"kind": "production", "id": production.id, "date": production.production_date})
+    
+    # Update stock level last so the row lock is held only until commit
+    apply_stock_deltas(db, deltas)
+    
+    db.refresh(production)
+    response = ProductionResponse.model_validate(production)
+    store_idempotent_response(db, idempotency_key, current_user.id, response, status.HTTP_201_CREATED)
     
     db.commit()
+    
+    return response
+
+
+@router.post("/purchase", response_model=PurchaseResponse, status_code=status.HTTP_201_CREATED)
+def create_quick_purchase(
+    entry: QuickPurchaseEntry,
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Quick entry for purchases (used on dashboard)."""
+    replay = idempotent_replay(db, request, idempotency_key, current_user.id, entry)
+    if replay:
+        return replay
+    
+    # Verify all items exist
+    item_ids = [item.item_id for item in entry.items]
+    found = db.query(func.count(Item.id)).filter(Item.id.in_(item_ids)).scalar()
+    
+    if found != len(set(item_ids)):
+        raise HTTPException(status_code=404, detail="One or more items not found")
+    
+    purchase, movements, deltas = _build_purchase(entry, current_user.id)
+    db.add(purchase)
+    db.add_all(movements)
+    db.flush()
+    
+    track_rollups(db, purchase.purchase_date, current_user.id, ReferenceType.PURCHASE, movements)
+    queue_event(db, "operation", {"kind": "purchase", "id": purchase.id, "date": purchase.purchase_date})
+    
+    apply_stock_deltas(db, deltas)
+    
+    db.refresh(purchase)
+    response = PurchaseResponse.model_validate(purchase)
+    store_idempotent_response(db, idempotency_key, current_user.id, response, status.HTTP_201_CREATED)
+    
+    db.commit()
+    
+    return response
+
+
+@router.post("/distribution", response_model=DistributionResponse, status_code=status.HTTP_201_CREATED)
+def create_quick_distribution(
+    entry: QuickDistributionEntry,
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Quick entry for distributions (used on dashboard)."""
+    replay = idempotent_replay(db, request, idempotency_key, current_user.id, entry)
+    if replay:
+        return replay
+    
+    # Verify all items exist
+    item_ids = [item.item_id for item in entry.items]
+    found = db.query(func.count(Item.id)).filter(Item.id.in_(item_ids)).scalar()
+    
+    if found != len(set(item_ids)):
+        raise HTTPException(status_code=404, detail="One or more items not found")
+    
+    # Stock sufficiency is enforced atomically by apply_stock_deltas below
+    distribution, movements, deltas = _build_distribution(entry, current_user.id)
+    db.add(distribution)
+    db.add_all(movements)
+    db.flush()
+    
+    track_operation(db, DISTRIBUTIONS, distribution.distribution_date)
+    track_rollups(db, distribution.distribution_date, current_user.id, ReferenceType.DISTRIBUTION, movements)
+    queue_event(db, "operation", {"kind": "distribution", "id": distribution.id, "date": distribution.distribution_date})
+    
+    apply_stock_deltas(db, deltas)
+    
     db.refresh(distribution)
+    response = DistributionResponse.model_validate(distribution)
+    store_idempotent_response(db, idempotency_key, current_user.id, response, status.HTTP_201_CREATED)
+    
+    db.commit()
+    
+    return response
+
+
+SYNC_BUILDERS = {
+    "production": (_build_production, PRODUCTIONS, "production_date"),
+    "purchase": (_build_purchase, None, "purchase_date"),
+    "distribution": (_build_distribution, DISTRIBUTIONS, "distribution_date"),
+}
+
+
+@router.post("/sync", response_model=QuickSyncResponse)
+def sync_quick_entries(
+    batch: QuickSyncRequest,
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Replay quick entries recorded offline, in order, in one transaction.
+    
+    Every referenced item is fetched (and locked) in one query, then entries
+    are checked in order against running stock levels, so an earlier
+    purchase can cover a later distribution. An entry that references a
+    missing item or would take stock below zero is rejected on its own;
+    all other entries are applied together. With an Idempotency-Key, a
+    retried sync returns the original results instead of applying again.
+    """
+    replay = idempotent_replay(db, request, idempotency_key, current_user.id, batch)
+    if replay:
+        return replay
+    
+    recipes = _load_recipes(db, {
+        entry.produced_item_id for entry in batch.entries if entry.type == "production" and entry.consume_materials
+    })
+    item_ids = sorted({
+        item_id
+        for entry in batch.entries
+        for item_id in (
+            [entry.produced_item_id] if entry.type == "production" else [i.item_id for i in entry.items]
+        )
+    } | {line[0] for recipe in recipes.values() for line in recipe})
+    items = {
+        row.id: row
+        for row in db.execute(
+            select(Item.id, Item.name, Item.current_stock_level)
+            .where(Item.id.in_(item_ids))
+            .order_by(Item.id)
+            .with_for_update(key_share=True)
+        )
+    }
+    levels = {item_id: row.current_stock_level for item_id, row in items.items()}
+    
+    results = []
+    records = []
+    movements = []
+    operations = {}
+    net_deltas = {}
+    for entry in batch.entries:
+        build, counter, date_field = SYNC_BUILDERS[entry.type]
+        if entry.type == "production" and entry.consume_materials:
+            record, entry_movements, deltas = build(entry, current_user.id, recipes.get(entry.produced_item_id, []))
+        else:
+            record, entry_movements, deltas = build(entry, current_user.id)
+        
+        error = None
+        missing = [item_id for item_id in deltas if item_id not in items]
+        if missing:
+            error = "Item not found" if entry.type == "production" else "One or more items not found"
+        else:
+            short = [item_id for item_id, delta in deltas.items() if levels[item_id] + delta < 0]
+            if short:
+                error = "; ".join(
+                    f"Insufficient stock for {items[item_id].name}. "
+                    f"Available: {levels[item_id]}, Requested: {-deltas[item_id]}"
+                    for item_id in short
+                )
+        
+        if error:
+            results.append(SyncEntryResult(client_id=entry.client_id, type=entry.type, status="rejected", error=error))
+            continue
+        
+        for item_id, delta in deltas.items():
+            levels[item_id] += delta
+            net_deltas[item_id] = net_deltas.get(item_id, 0) + delta
+        records.append(record)
+        movements.extend(entry_movements)
+        when = getattr(record, date_field)
+        if counter:
+            day = day_counter(counter, when.date())
+            operations[day] = operations.get(day, 0) + 1
+        track_rollups(db, when, current_user.id, ReferenceType(entry.type), entry_movements)
+        queue_event(db, "operation", {"kind": entry.type, "id": record.id, "date": when})
+        results.append(SyncEntryResult(client_id=entry.client_id, type=entry.type, status="applied", id=record.id))
+    
+    if records:
+        db.add_all(records)
+        db.add_all(movements)
+        db.flush()
+        bump(db, operations)
+        apply_stock_deltas(db, net_deltas, locked=True)
     
-    return distribution
+    applied = len(records)
+    response = QuickSyncResponse(applied=applied, rejected=len(results) - applied, results=results)
+    store_idempotent_response(db, idempotency_key, current_user.id, response)
+    db.commit()
+    
+    return response
+
+
+def _recent_activity(db: Session, limit: int, cursor: Optional[str] = None):
+    """Newest-first movements with item, user and distribution resolved in one query.
+
+    Returns (entries, next_cursor); next_cursor is None on the last page.
+    """
+    query = (
+        db.query(
+            StockMovement.id,
+            StockMovement.reference_type,
+            StockMovement.movement_type,
+            StockMovement.quantity,
+            StockMovement.created_at,
+            StockMovement.notes,
+            Item.name.label("item_name"),
+            User.full_name.label("user_name"),
+            Distribution.recipient_info,
+            Distribution.notes.label("distribution_notes"),
+        )
+        .outerjoin(Item, Item.id == StockMovement.item_id)
+        .outerjoin(User, User.id == StockMovement.user_id)
+        .outerjoin(Distribution, and_(
+            StockMovement.reference_type == ReferenceType.DISTRIBUTION,
+            Distribution.id == StockMovement.reference_id
+        ))
+    )
+    if cursor:
+        before_at, before_id = decode_cursor(cursor, datetime.fromisoformat, uuid.UUID)
+        query = query.filter(or_(
+            StockMovement.created_at < before_at,
+            and_(StockMovement.created_at == before_at, StockMovement.id < before_id)
+        ))
+
+    rows = query.order_by(StockMovement.created_at.desc(), StockMovement.id.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at.isoformat(), str(rows[-1].id))
+
+    entries = [
+        ActivityEntry(
+            id=row.id,
+            type=row.reference_type.value,
+            item_name=row.item_name or "Unknown",
+            quantity=float(row.quantity),
+            movement_type=row.movement_type.value,
+            timestamp=row.created_at.isoformat(),
+            user_name=row.user_name or "Unknown",
+            recipient_info=row.recipient_info,
+            notes=row.distribution_notes or row.notes
+        )
+        for row in rows
+    ]
+    return entries, next_cursor
 
 
 @router.get("/dashboard/stats", response_model=DashboardStats)
 def get_dashboard_stats(
+    activity_limit: int = Query(10, ge=0, le=100),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get dashboard statistics and recent activity."""
-    from datetime import timedelta
-    from sqlalchemy import func
-    
-    # Calculate date range for "this week"
-    today = datetime.utcnow()
-    week_start = today - timedelta(days=7)
-    
-    # Count totals
-    total_items = db.query(func.count(Item.id)).scalar()
-    
-    # Count low stock items
-    low_stock_items = db.query(func.count(Item.id)).filter(
-        Item.minimum_stock_level.isnot(None),
-        Item.current_stock_level <= Item.minimum_stock_level
-    ).scalar()
-    
-    # Count productions this week
-    productions_this_week = db.query(func.count(Production.id)).filter(
-        Production.production_date >= week_start
-    ).scalar()
-    
-    # Count distributions this week
-    distributions_this_week = db.query(func.count(Distribution.id)).filter(
-        Distribution.distribution_date >= week_start
-    ).scalar()
-    
-    # Get recent activity (last 10 movements)
-    recent_movements = db.query(StockMovement).order_by(
-        StockMovement.created_at.desc()
-    ).limit(10).all()
-    
-    recent_activity = []
-    for movement in recent_movements:
-        item = db.query(Item).filter(Item.id == movement.item_id).first()
-        user = db.query(User).filter(User.id == movement.user_id).first()
-        
-        # Get recipient info and notes if this is a distribution
-        recipient_info = None
-        notes = movement.notes
-        if movement.reference_type == ReferenceType.DISTRIBUTION and movement.reference_id:
-            distribution = db.query(Distribution).filter(Distribution.id == movement.reference_id).first()
-            if distribution:
-                recipient_info = distribution.recipient_info
-                notes = distribution.notes or notes
-        
-        recent_activity.append({
-            "type": movement.reference_type.value,
-            "item_name": item.name if item else "Unknown",
-            "quantity": float(movement.quantity),
-            "movement_type": movement.movement_type.value,
-            "timestamp": movement.created_at.isoformat(),
-            "user_name": user.full_name if user else "Unknown",
-            "recipient_info": recipient_info,
-            "notes": notes
-        })
+    # Counts come from incrementally maintained counters (constant-time reads)
+    counts = dashboard_counts(db, datetime.utcnow())
+    
+    recent_activity, _ = _recent_activity(db, activity_limit) if activity_limit else ([], None)
     
     return DashboardStats(
-        total_items=total_items or 0,
-        low_stock_items=low_stock_items or 0,
-        productions_this_week=productions_this_week or 0,
-        distributions_this_week=distributions_this_week or 0,
+        total_items=counts["total_items"],
+        low_stock_items=counts["low_stock_items"],
+        productions_this_week=counts["productions_this_week"],
+        distributions_this_week=counts["distributions_this_week"],
         recent_activity=recent_activity
     )
+
+
+@router.get("/activity", response_model=List[ActivityEntry])
+def list_activity(
+    response: Response,
+    limit: int = Query(20, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's X-Next-Cursor header"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Activity feed, newest first, scrolling back through history.
+    
+    Each page is a single query regardless of its size. When more entries
+    exist, the X-Next-Cursor header holds the cursor for the next page.
+    """
+    entries, next_cursor = _recent_activity(db, limit, cursor)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return entries
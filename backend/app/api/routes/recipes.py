@@ -0,0 +1,129 @@
+"""Production recipe (bill of materials) API routes."""
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import func, delete, insert
+from typing import List, Optional
+import uuid
+
+from app.db.session import get_db
+from app.db.models.user import User
+from app.db.models.item import Item
+from app.db.models.production import RecipeComponent
+from app.schemas.recipe import RecipeUpdate, RecipeResponse, RecipeComponentResponse
+from app.api.deps import get_current_active_user
+
+router = APIRouter()
+
+
+def _recipes(db: Session, product_item_id: Optional[uuid.UUID] = None) -> List[RecipeResponse]:
+    """Recipes with product and material names resolved in one query."""
+    product = aliased(Item)
+    material = aliased(Item)
+    query = (
+        db.query(
+            RecipeComponent.product_item_id,
+            product.name,
+            RecipeComponent.material_item_id,
+            material.name,
+            material.unit_of_measure,
+            RecipeComponent.quantity_per_unit,
+        )
+        .join(product, product.id == RecipeComponent.product_item_id)
+        .join(material, material.id == RecipeComponent.material_item_id)
+        .order_by(product.name, RecipeComponent.product_item_id, material.name)
+    )
+    if product_item_id:
+        query = query.filter(RecipeComponent.product_item_id == product_item_id)
+
+    recipes = {}
+    for product_id, product_name, material_id, material_name, unit, per_unit in query.all():
+        recipe = recipes.setdefault(product_id, RecipeResponse(
+            product_item_id=product_id, product_name=product_name, components=[]
+        ))
+        recipe.components.append(RecipeComponentResponse(
+            material_item_id=material_id,
+            material_name=material_name,
+            unit_of_measure=unit,
+            quantity_per_unit=per_unit
+        ))
+    return list(recipes.values())
+
+
+@router.get("", response_model=List[RecipeResponse])
+def list_recipes(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """List every production recipe."""
+    return _recipes(db)
+
+
+@router.get("/{item_id}", response_model=RecipeResponse)
+def get_recipe(
+    item_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Raw materials consumed per unit of an item."""
+    item = db.query(Item).filter(Item.id == item_id).first()
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+
+    recipes = _recipes(db, item_id)
+    return recipes[0] if recipes else RecipeResponse(product_item_id=item.id, product_name=item.name, components=[])
+
+
+@router.put("/{item_id}", response_model=RecipeResponse)
+def set_recipe(
+    item_id: uuid.UUID,
+    body: RecipeUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Replace an item's recipe. Productions of the item then deduct these materials."""
+    item = db.query(Item).filter(Item.id == item_id).first()
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+
+    material_ids = [c.material_item_id for c in body.components]
+    if item_id in material_ids:
+        raise HTTPException(status_code=400, detail="An item cannot be a raw material of itself")
+    if material_ids:
+        found = db.query(func.count(Item.id)).filter(Item.id.in_(material_ids)).scalar()
+        if found != len(material_ids):
+            raise HTTPException(status_code=404, detail="One or more material items not found")
+
+    db.execute(
+        delete(RecipeComponent)
+        .where(RecipeComponent.product_item_id == item_id)
+        .execution_options(synchronize_session=False)
+    )
+    if body.components:
+        db.execute(insert(RecipeComponent), [
+            {
+                "product_item_id": item_id,
+                "material_item_id": c.material_item_id,
+                "quantity_per_unit": c.quantity_per_unit,
+            }
+            for c in body.components
+        ])
+    db.commit()
+
+    return get_recipe(item_id, db, current_user)
+
+
+@router.delete("/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_recipe(
+    item_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Remove an item's recipe; its productions stop deducting materials."""
+    db.execute(
+        delete(RecipeComponent)
+        .where(RecipeComponent.product_item_id == item_id)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+    return None
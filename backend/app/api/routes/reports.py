@@ -1,16 +1,18 @@
 """Reports API routes for activity tracking and summaries."""
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
-from datetime import datetime, timedelta
+from sqlalchemy import func, and_, or_, case, literal, select, union_all
+from datetime import date, datetime, time, timedelta, timezone
 from typing import List, Optional
+import uuid
 
 from app.db.session import get_db
 from app.db.models.user import User
 from app.db.models.item import Item
 from app.db.models.production import Production
 from app.db.models.operations import Purchase, Distribution, Assembly, DistributionType
-from app.db.models.stock_movement import StockMovement, ReferenceType
+from app.db.models.stock_movement import StockMovement, MovementType, ReferenceType
+from app.db.models.rollup import DailyItemFlow, DailyUserActivity
 from app.schemas.reports import (
     ActivitySummary,
     UserActivity,
@@ -25,15 +27,149 @@ from app.api.deps import get_current_active_user
 router = APIRouter()
 
 
+# Operation kinds: the per-user activity counts and the detail sections `include` can load
+DETAIL_SECTIONS = ("productions", "purchases", "distributions", "assemblies")
+
+
+def _raw_activity_counts(db: Session, ranges):
+    """Per-user operation counts and items distributed over half-open datetime ranges, in one query.
+    
+    Each operation table contributes (user, kind, quantity) rows to a UNION
+    ALL that is grouped by user in the database, so only one row per active
+    user comes back however many operations there are. Items distributed are
+    summed from the distributions' OUT movements.
+    """
+    def within(column):
+        return or_(*(and_(column >= start, column < end) for start, end in ranges))
+    
+    operations = union_all(
+        select(
+            Production.produced_by_user_id.label("user_id"),
+            literal("production").label("kind"),
+            literal(0).label("quantity")
+        ).where(within(Production.production_date)),
+        select(Purchase.received_by_user_id, literal("purchase"), literal(0))
+        .where(within(Purchase.purchase_date)),
+        select(Distribution.distributed_by_user_id, literal("distribution"), literal(0))
+        .where(within(Distribution.distribution_date)),
+        select(Assembly.assembled_by_user_id, literal("assembly"), literal(0))
+        .where(within(Assembly.assembly_date)),
+        select(Distribution.distributed_by_user_id, literal("distributed_item"), StockMovement.quantity)
+        .join(StockMovement, and_(
+            StockMovement.reference_id == Distribution.id,
+            StockMovement.reference_type == ReferenceType.DISTRIBUTION,
+            StockMovement.movement_type == MovementType.OUT
+        ))
+        .where(within(Distribution.distribution_date)),
+    ).subquery()
+    
+    def count(kind):
+        return func.sum(case((operations.c.kind == kind, 1), else_=0))
+    
+    return db.execute(
+        select(
+            operations.c.user_id,
+            count("production").label("productions"),
+            count("purchase").label("purchases"),
+            count("distribution").label("distributions"),
+            count("assembly").label("assemblies"),
+            func.coalesce(func.sum(operations.c.quantity), 0).label("items_distributed")
+        ).group_by(operations.c.user_id)
+    ).all()
+
+
+def _rollup_activity_counts(db: Session, first_day: date, end_day: date):
+    """Same shape as _raw_activity_counts for whole days [first_day, end_day), from the daily rollups."""
+    def count(operation):
+        return func.sum(case((DailyUserActivity.operation == operation, DailyUserActivity.count), else_=0))
+    
+    rows = db.execute(
+        select(
+            DailyUserActivity.user_id,
+            count(ReferenceType.PRODUCTION).label("productions"),
+            count(ReferenceType.PURCHASE).label("purchases"),
+            count(ReferenceType.DISTRIBUTION).label("distributions"),
+            count(ReferenceType.ASSEMBLY).label("assemblies"),
+            literal(0).label("items_distributed")
+        )
+        .where(DailyUserActivity.day >= first_day, DailyUserActivity.day < end_day)
+        .group_by(DailyUserActivity.user_id)
+    ).all()
+    distributed = db.query(func.coalesce(func.sum(DailyItemFlow.quantity), 0)).filter(
+        DailyItemFlow.day >= first_day,
+        DailyItemFlow.day < end_day,
+        DailyItemFlow.reference_type == ReferenceType.DISTRIBUTION,
+        DailyItemFlow.movement_type == MovementType.OUT
+    ).scalar()
+    return rows, distributed
+
+
+def _user_activity_counts(db: Session, date_from: datetime, date_to: datetime):
+    """({user_id: {kind: count}}, items distributed) for operations dated in [date_from, date_to].
+    
+    Whole days come from the daily rollups; only the partial days at either
+    end of the range are counted from the operation tables, so the work is
+    bounded by the number of days (and one day of raw rows at each edge)
+    rather than by the number of operations.
+    """
+    # Operation dates are stored as naive UTC
+    date_from, date_to = (d.astimezone(timezone.utc).replace(tzinfo=None) if d.tzinfo else d for d in (date_from, date_to))
+    end = date_to + timedelta(microseconds=1)
+    first_day = date_from.date() if date_from.time() == time.min else date_from.date() + timedelta(days=1)
+    end_day = end.date()
+    
+    rows = []
+    items_distributed = 0
+    if first_day < end_day:
+        rollup_rows, items_distributed = _rollup_activity_counts(db, first_day, end_day)
+        rows.extend(rollup_rows)
+        ranges = [
+            (start, stop) for start, stop in (
+                (date_from, datetime.combine(first_day, time.min)),
+                (datetime.combine(end_day, time.min), end),
+            ) if start < stop
+        ]
+    else:
+        ranges = [(date_from, end)]
+    if ranges:
+        rows.extend(_raw_activity_counts(db, ranges))
+    
+    activity = {}
+    for row in rows:
+        counts = activity.setdefault(row.user_id, dict.fromkeys(DETAIL_SECTIONS, 0))
+        for kind in DETAIL_SECTIONS:
+            counts[kind] += int(getattr(row, kind) or 0)
+        items_distributed += row.items_distributed or 0
+    return {user_id: counts for user_id, counts in activity.items() if any(counts.values())}, items_distributed
+
+
+def _names(db: Session, column_id, column_name, ids) -> dict:
+    """str(id) -> name for just the ids a report references, in one query."""
+    ids = {uuid.UUID(str(i)) for i in ids if i}
+    if not ids:
+        return {}
+    return {str(row_id): name for row_id, name in db.query(column_id, column_name).filter(column_id.in_(ids))}
+
+
 @router.get("/activity", response_model=ComprehensiveReport)
 def get_activity_report(
     period: str = Query("week", description="Time period: day, week, month"),
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
+    include: Optional[str] = Query(
+        None, description="Comma-separated detail sections to load: productions, purchases, distributions, assemblies, or all"
+    ),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get comprehensive activity report for specified period."""
+    """Get comprehensive activity report for specified period.
+    
+    The summary and per-user activity come from the daily rollups for
+    whole days plus one aggregate query for partial days at the edges.
+    Detail sections are empty unless named in ``include``; each requested
+    section is one query, plus one query each for the user and item names
+    they reference.
+    """
     
     # Calculate date range
     now = datetime.utcnow()
@@ -53,19 +189,74 @@ def get_activity_report(
         date_from = now - timedelta(days=7)
         date_to = now
     
-    # Get all users for reference
-    users = db.query(User).all()
-    users_dict = {str(user.id): user.full_name for user in users}
+    sections = {s.strip() for s in include.split(",")} if include else set()
+    if "all" in sections:
+        sections = set(DETAIL_SECTIONS)
     
-    # Get all items for reference
-    items = db.query(Item).all()
-    items_dict = {str(item.id): item.name for item in items}
+    activity, items_distributed = _user_activity_counts(db, date_from, date_to)
+    activity_names = _names(db, User.id, User.full_name, activity)
+    user_activity_list = sorted(
+        (
+            UserActivity(
+                user_name=activity_names.get(str(user_id), "Unknown"),
+                productions_count=counts["productions"],
+                purchases_count=counts["purchases"],
+                distributions_count=counts["distributions"],
+                assemblies_count=counts["assemblies"],
+                total_entries=sum(counts.values())
+            )
+            for user_id, counts in activity.items()
+        ),
+        key=lambda u: u.user_name
+    )
+    
+    # Activity Summary
+    summary = ActivitySummary(
+        period=period,
+        date_from=date_from,
+        date_to=date_to,
+        total_productions=sum(c["productions"] for c in activity.values()),
+        total_purchases=sum(c["purchases"] for c in activity.values()),
+        total_distributions=sum(c["distributions"] for c in activity.values()),
+        total_assemblies=sum(c["assemblies"] for c in activity.values()),
+        total_items_distributed=int(items_distributed),
+        unique_users=len(activity)
+    )
     
-    # Productions
     productions_query = db.query(Production).filter(
         Production.production_date >= date_from,
         Production.production_date <= date_to
-    ).all()
+    ).all() if "productions" in sections else []
+    
+    purchases_query = db.query(Purchase).filter(
+        Purchase.purchase_date >= date_from,
+        Purchase.purchase_date <= date_to
+    ).all() if "purchases" in sections else []
+    
+    distributions_query = db.query(Distribution).filter(
+        Distribution.distribution_date >= date_from,
+        Distribution.distribution_date <= date_to
+    ).all() if "distributions" in sections else []
+    
+    assemblies_query = db.query(Assembly).filter(
+        Assembly.assembly_date >= date_from,
+        Assembly.assembly_date <= date_to
+    ).all() if "assemblies" in sections else []
+    
+    # Names for only the users and items the loaded details reference
+    users_dict = _names(db, User.id, User.full_name, [
+        *(p.produced_by_user_id for p in productions_query),
+        *(p.received_by_user_id for p in purchases_query),
+        *(d.distributed_by_user_id for d in distributions_query),
+        *(a.assembled_by_user_id for a in assemblies_query),
+    ])
+    items_dict = _names(db, Item.id, Item.name, [
+        *(p.produced_item_id for p in productions_query),
+        *(i.get('item_id') for p in purchases_query for i in p.items_purchased),
+        *(i.get('item_id') for d in distributions_query for i in d.items_distributed),
+        *(a.kit_type_item_id for a in assemblies_query),
+        *(c.get('item_id') for a in assemblies_query for c in a.component_items),
+    ])
     
     productions = []
     for prod in productions_query:
@@ -78,12 +269,6 @@ def get_activity_report(
             notes=prod.notes
         ))
     
-    # Purchases
-    purchases_query = db.query(Purchase).filter(
-        Purchase.purchase_date >= date_from,
-        Purchase.purchase_date <= date_to
-    ).all()
-    
     purchases = []
     for purch in purchases_query:
         items_list = []
@@ -105,24 +290,15 @@ def get_activity_report(
             notes=purch.notes
         ))
     
-    # Distributions
-    distributions_query = db.query(Distribution).filter(
-        Distribution.distribution_date >= date_from,
-        Distribution.distribution_date <= date_to
-    ).all()
-    
     distributions = []
-    total_distributions = 0
     for dist in distributions_query:
         items_list = []
         for item_data in dist.items_distributed:
             item_id = item_data.get('item_id')
-            qty = item_data.get('quantity', 0)
             items_list.append({
                 'item_name': items_dict.get(str(item_id), "Unknown"),
-                'quantity': qty
+                'quantity': item_data.get('quantity', 0)
             })
-            total_distributions += qty
         
         distributions.append(DistributionSummary(
             id=str(dist.id),
@@ -135,12 +311,6 @@ def get_activity_report(
             notes=dist.notes
         ))
     
-    # Assemblies (kits)
-    assemblies_query = db.query(Assembly).filter(
-        Assembly.assembly_date >= date_from,
-        Assembly.assembly_date <= date_to
-    ).all()
-    
     assemblies = []
     for asm in assemblies_query:
         components_list = []
@@ -161,83 +331,6 @@ def get_activity_report(
             notes=asm.notes
         ))
     
-    # User Activity Summary
-    user_activities = {}
-    
-    # Count by user
-    for prod in productions_query:
-        user_id = str(prod.produced_by_user_id)
-        if user_id not in user_activities:
-            user_activities[user_id] = {
-                'user_name': users_dict.get(user_id, "Unknown"),
-                'productions': 0,
-                'purchases': 0,
-                'distributions': 0,
-                'assemblies': 0
-            }
-        user_activities[user_id]['productions'] += 1
-    
-    for purch in purchases_query:
-        user_id = str(purch.received_by_user_id)
-        if user_id not in user_activities:
-            user_activities[user_id] = {
-                'user_name': users_dict.get(user_id, "Unknown"),
-                'productions': 0,
-                'purchases': 0,
-                'distributions': 0,
-                'assemblies': 0
-            }
-        user_activities[user_id]['purchases'] += 1
-    
-    for dist in distributions_query:
-        user_id = str(dist.distributed_by_user_id)
-        if user_id not in user_activities:
-            user_activities[user_id] = {
-                'user_name': users_dict.get(user_id, "Unknown"),
-                'productions': 0,
-                'purchases': 0,
-                'distributions': 0,
-                'assemblies': 0
-            }
-        user_activities[user_id]['distributions'] += 1
-    
-    for asm in assemblies_query:
-        user_id = str(asm.assembled_by_user_id)
-        if user_id not in user_activities:
-            user_activities[user_id] = {
-                'user_name': users_dict.get(user_id, "Unknown"),
-                'productions': 0,
-                'purchases': 0,
-                'distributions': 0,
-                'assemblies': 0
-            }
-        user_activities[user_id]['assemblies'] += 1
-    
-    user_activity_list = [
-        UserActivity(
-            user_name=data['user_name'],
-            productions_count=data['productions'],
-            purchases_count=data['purchases'],
-            distributions_count=data['distributions'],
-            assemblies_count=data['assemblies'],
-            total_entries=data['productions'] + data['purchases'] + data['distributions'] + data['assemblies']
-        )
-        for data in user_activities.values()
-    ]
-    
-    # Activity Summary
-    summary = ActivitySummary(
-        period=period,
-        date_from=date_from,
-        date_to=date_to,
-        total_productions=len(productions),
-        total_purchases=len(purchases),
-        total_distributions=len(distributions),
-        total_assemblies=len(assemblies),
-        total_items_distributed=int(total_distributions),
-        unique_users=len(user_activities)
-    )
-    
     return ComprehensiveReport(
         summary=summary,
         user_activities=user_activity_list,
@@ -0,0 +1,218 @@
+"""What-if simulation API: preview a sequence of operations, then commit it."""
+from fastapi import APIRouter, Body, Depends, HTTPException, status
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from datetime import datetime
+from decimal import Decimal
+import uuid
+
+from app.db.session import get_db
+from app.db.models.user import User
+from app.db.models.item import Item
+from app.db.models.kit_template import KitTemplate
+from app.db.models.operations import Assembly
+from app.db.models.stock_movement import StockMovement, ReferenceType
+from app.schemas.simulation import (
+    SimulationStep,
+    SimulationStepResult,
+    SimulationResponse,
+    SimulationCommitted,
+    SimulationCommitResponse
+)
+from app.api.deps import get_current_active_user
+from app.api.stock import apply_stock_deltas
+from app.api.events import queue_event
+from app.api.rollups import track_rollups
+from app.api.counters import bump, day_counter, DISTRIBUTIONS
+from app.api.simulation import SimulationSession, simulations, MAX_STEPS
+from app.api.routes.kit_assembly import assembly_rows_for
+from app.api.routes.quick_entry import _build_purchase, _build_distribution
+
+router = APIRouter()
+
+
+def _get_session(session_id: uuid.UUID, user: User) -> SimulationSession:
+    session = simulations.get(session_id, user.id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Simulation not found or expired")
+    return session
+
+
+def _response(session: SimulationSession) -> SimulationResponse:
+    return SimulationResponse(
+        id=session.id,
+        snapshot_at=session.snapshot_at,
+        expires_at=session.expires_at,
+        steps=[result for _, _, result in session.steps]
+    )
+
+
+@router.post("", response_model=SimulationResponse, status_code=status.HTTP_201_CREATED)
+def create_simulation(
+    current_user: User = Depends(get_current_active_user)
+):
+    """Start an empty simulation.
+
+    Each item's stock level and each kit template is snapshotted the first
+    time a step uses it; later steps run against that snapshot in memory.
+    """
+    session = SimulationSession(current_user.id)
+    simulations.add(session)
+    return _response(session)
+
+
+@router.get("/{session_id}", response_model=SimulationResponse)
+def get_simulation(
+    session_id: uuid.UUID,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Steps run so far, with projected levels and shortfalls for each."""
+    session = _get_session(session_id, current_user)
+    with session.lock:
+        return _response(session)
+
+
+@router.post("/{session_id}/steps", response_model=SimulationStepResult)
+def run_simulation_step(
+    session_id: uuid.UUID,
+    step: SimulationStep = Body(..., discriminator="type"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Project an assembly, purchase or distribution against the simulated stock.
+
+    Only items and templates this simulation has not used before are read
+    from the database. A step that would take any item below zero is
+    returned with its shortfalls and not applied to the projection.
+    """
+    session = _get_session(session_id, current_user)
+    with session.lock:
+        if len(session.steps) >= MAX_STEPS:
+            raise HTTPException(status_code=400, detail=f"A simulation is limited to {MAX_STEPS} steps")
+        return session.run(db, step)
+
+
+@router.delete("/{session_id}/steps/last", response_model=SimulationStepResult)
+def undo_simulation_step(
+    session_id: uuid.UUID,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Remove the most recent step and restore the levels it projected."""
+    session = _get_session(session_id, current_user)
+    with session.lock:
+        result = session.undo()
+    if result is None:
+        raise HTTPException(status_code=404, detail="Simulation has no steps")
+    return result
+
+
+@router.delete("/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
+def discard_simulation(
+    session_id: uuid.UUID,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Discard a simulation without applying it."""
+    _get_session(session_id, current_user)
+    simulations.discard(session_id)
+    return None
+
+
+@router.post("/{session_id}/commit", response_model=SimulationCommitResponse)
+def commit_simulation(
+    session_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Apply the accepted steps for real, in one transaction.
+
+    Every item the plan touches is locked in id order and compared with
+    the snapshot; if any level, or any template used, has changed since,
+    nothing is applied and 409 lists what changed. Start a new simulation
+    to plan against current stock. The session ends on success.
+    """
+    session = _get_session(session_id, current_user)
+    with session.lock:
+        accepted = session.accepted_steps()
+        if not accepted:
+            raise HTTPException(status_code=400, detail="Simulation has no accepted steps to commit")
+
+        net_deltas = {}
+        for _, _, deltas in accepted:
+            for item_id, delta in deltas.items():
+                net_deltas[item_id] = net_deltas.get(item_id, 0) + delta
+
+        current = {
+            row.id: row
+            for row in db.execute(
+                select(Item.id, Item.name, Item.current_stock_level)
+                .where(Item.id.in_(sorted(net_deltas)))
+                .order_by(Item.id)
+                .with_for_update(key_share=True)
+            )
+        }
+        changed = [
+            session.items[item_id][0]
+            for item_id in net_deltas
+            if item_id not in current or current[item_id].current_stock_level != session.snapshot[item_id]
+        ]
+
+        template_ids = {step.kit_template_id for _, step, _ in accepted if step.type == "assembly"}
+        templates = {
+            t.id: t
+            for t in db.query(KitTemplate).filter(KitTemplate.id.in_(template_ids), KitTemplate.is_active == True)
+        } if template_ids else {}
+        changed.extend(
+            f"template {template_id}"
+            for template_id in template_ids
+            if template_id not in templates or templates[template_id].updated_at != session.templates[template_id][0]
+        )
+        if changed:
+            db.rollback()
+            raise HTTPException(
+                status_code=409,
+                detail="Stock changed since the simulation started: " + ", ".join(sorted(changed))
+            )
+
+        now = datetime.utcnow()
+        names = {item_id: row.name for item_id, row in current.items()}
+        records = []
+        movements = []
+        assembly_rows = []
+        movement_rows = []
+        distributions = {}
+        operations = []
+        for index, step, _ in accepted:
+            if step.type == "assembly":
+                assembly_row, rows = assembly_rows_for(templates[step.kit_template_id], step, names, current_user.id, now)
+                assembly_rows.append(assembly_row)
+                movement_rows.extend(rows)
+                record_id, when, step_movements = assembly_row["id"], now, rows
+            else:
+                build, date_field = (
+                    (_build_purchase, "purchase_date") if step.type == "purchase"
+                    else (_build_distribution, "distribution_date")
+                )
+                record, step_movements, _ = build(step, current_user.id)
+                records.append(record)
+                movements.extend(step_movements)
+                record_id, when = record.id, getattr(record, date_field)
+                if step.type == "distribution":
+                    day = day_counter(DISTRIBUTIONS, when.date())
+                    distributions[day] = distributions.get(day, 0) + 1
+            track_rollups(db, when, current_user.id, ReferenceType(step.type), step_movements)
+            queue_event(db, "operation", {"kind": step.type, "id": record_id, "date": when})
+            operations.append(SimulationCommitted(index=index, type=step.type, id=record_id))
+
+        db.add_all(records)
+        db.add_all(movements)
+        db.flush()
+        if assembly_rows:
+            db.execute(insert(Assembly), assembly_rows)
+            db.execute(insert(StockMovement), movement_rows)
+        bump(db, distributions)
+        apply_stock_deltas(db, {item_id: Decimal(delta) for item_id, delta in net_deltas.items()}, locked=True)
+        db.commit()
+
+        simulations.discard(session.id)
+
+    return SimulationCommitResponse(applied=len(operations), operations=operations)
@@ -0,0 +1,192 @@
+"""In-memory what-if sessions for assembly, purchase and distribution plans.
+
+A session reads an item's stock level, or a kit template, the first time
+a step touches it and keeps that snapshot, so memory grows with the steps
+run rather than the size of the catalog; later steps on the same items
+answer from memory. Steps that would take an item below zero are rejected
+and leave the projected levels unchanged; accepted steps form the plan
+that can later be committed, provided the stock they touch has not changed
+since it was snapshotted.
+
+Sessions live in the memory of the worker that created them and expire
+after ``SIMULATION_TTL_MINUTES`` without use.
+"""
+from sqlalchemy.orm import Session
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional
+import threading
+import uuid
+
+from app.core.config import settings
+from app.db.models.item import Item
+from app.db.models.kit_template import KitTemplate
+from app.api.counters import is_low
+from app.schemas.simulation import SimulationLevel, SimulationShortfall, SimulationStepResult
+
+MAX_SESSIONS = 200
+MAX_STEPS = 500
+
+
+class SimulationSession:
+    """Stock snapshot plus the projected levels after the accepted steps so far."""
+
+    def __init__(self, user_id: uuid.UUID):
+        self.id = uuid.uuid4()
+        self.user_id = user_id
+        self.snapshot_at = datetime.utcnow()
+        self.touch()
+        self.lock = threading.Lock()
+
+        # Filled in as steps touch items and templates
+        self.items = {}
+        self.snapshot: Dict[uuid.UUID, Decimal] = {}
+        self.levels: Dict[uuid.UUID, Decimal] = {}
+        # template id -> (updated_at, [(component id, per kit)], kit item id)
+        self.templates = {}
+
+        # (step, deltas, result) in the order they were run
+        self.steps: List[tuple] = []
+
+    def _load_template(self, db: Session, template_id: uuid.UUID) -> None:
+        if template_id in self.templates:
+            return
+        template = db.query(KitTemplate).filter(KitTemplate.id == template_id, KitTemplate.is_active == True).first()
+        if template is not None:
+            self.templates[template.id] = (
+                template.updated_at, [(c.item_id, c.quantity) for c in template.components], template.kit_item_id
+            )
+
+    def _load_items(self, db: Session, item_ids) -> None:
+        """Snapshot the active items among item_ids not seen yet, in one query."""
+        unseen = [item_id for item_id in item_ids if item_id not in self.items]
+        if not unseen:
+            return
+        for item_id, name, level, minimum in db.query(
+            Item.id, Item.name, Item.current_stock_level, Item.minimum_stock_level
+        ).filter(Item.id.in_(unseen), Item.archived_at.is_(None)):
+            self.items[item_id] = (name, minimum)
+            self.snapshot[item_id] = Decimal(0) if level is None else level
+            self.levels[item_id] = self.snapshot[item_id]
+
+    def touch(self) -> None:
+        self.expires_at = datetime.utcnow() + timedelta(minutes=settings.SIMULATION_TTL_MINUTES)
+
+    def step_deltas(self, step) -> Dict[uuid.UUID, Decimal]:
+        """Stock change per item for a step; raises KeyError for an unknown template."""
+        deltas = {}
+        if step.type == "assembly":
+            _, components, kit_item_id = self.templates[step.kit_template_id]
+            for item_id, per_kit in components:
+                deltas[item_id] = deltas.get(item_id, 0) - Decimal(per_kit * step.quantity)
+            deltas[kit_item_id] = deltas.get(kit_item_id, 0) + Decimal(step.quantity)
+        else:
+            sign = 1 if step.type == "purchase" else -1
+            for line in step.items:
+                deltas[line.item_id] = deltas.get(line.item_id, 0) + sign * line.quantity
+        return deltas
+
+    def run(self, db: Session, step) -> SimulationStepResult:
+        """Project one step; it is accepted only if every item stays at or above zero.
+
+        Only items and templates the session has not seen yet are read.
+        """
+        index = len(self.steps)
+        if step.type == "assembly":
+            self._load_template(db, step.kit_template_id)
+        try:
+            deltas = self.step_deltas(step)
+        except KeyError:
+            result = SimulationStepResult(
+                index=index, type=step.type, accepted=False, levels=[], shortfalls=[],
+                error="Kit template not found or inactive"
+            )
+            self.steps.append((step, {}, result))
+            return result
+        self._load_items(db, deltas)
+
+        shortfalls = [
+            SimulationShortfall(
+                item_id=item_id,
+                item_name=self.items[item_id][0] if item_id in self.items else "Unknown",
+                required=-delta,
+                available=self.levels.get(item_id, Decimal(0))
+            )
+            for item_id, delta in deltas.items()
+            if item_id not in self.levels or self.levels[item_id] + delta < 0
+        ]
+        accepted = not shortfalls
+
+        levels = []
+        for item_id, delta in deltas.items():
+            if item_id not in self.levels:
+                continue
+            name, minimum = self.items[item_id]
+            before = self.levels[item_id]
+            after = before + delta if accepted else before
+            levels.append(SimulationLevel(
+                item_id=item_id, item_name=name, before=before, after=after, low=is_low(after, minimum)
+            ))
+            self.levels[item_id] = after
+
+        error = None
+        if any(item_id not in self.items for item_id in deltas):
+            error = "One or more items not found"
+        elif shortfalls:
+            error = "Insufficient stock"
+        result = SimulationStepResult(
+            index=index, type=step.type, accepted=accepted, levels=levels, shortfalls=shortfalls, error=error
+        )
+        self.steps.append((step, deltas if accepted else {}, result))
+        return result
+
+    def undo(self) -> Optional[SimulationStepResult]:
+        """Remove the last step, restoring the levels it changed."""
+        if not self.steps:
+            return None
+        _, deltas, result = self.steps.pop()
+        for item_id, delta in deltas.items():
+            self.levels[item_id] -= delta
+        return result
+
+    def accepted_steps(self) -> List[tuple]:
+        """(index, step, deltas) of every accepted step, in order."""
+        return [(result.index, step, deltas) for step, deltas, result in self.steps if result.accepted]
+
+
+class SimulationStore:
+    """Sessions by id, evicting expired ones and then the least recently used."""
+
+    def __init__(self, max_sessions: int = MAX_SESSIONS):
+        self._max_sessions = max_sessions
+        self._sessions: "OrderedDict[uuid.UUID, SimulationSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, session: SimulationSession) -> None:
+        now = datetime.utcnow()
+        with self._lock:
+            for session_id in [s.id for s in self._sessions.values() if s.expires_at <= now]:
+                del self._sessions[session_id]
+            self._sessions[session.id] = session
+            while len(self._sessions) > self._max_sessions:
+                self._sessions.popitem(last=False)
+
+    def get(self, session_id: uuid.UUID, user_id: uuid.UUID) -> Optional[SimulationSession]:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None or session.user_id != user_id:
+                return None
+            if session.expires_at <= datetime.utcnow():
+                del self._sessions[session_id]
+                return None
+            self._sessions.move_to_end(session_id)
+            session.touch()
+            return session
+
+    def discard(self, session_id: uuid.UUID) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+
+simulations = SimulationStore()
@@ -0,0 +1,114 @@
+"""Atomic stock mutations shared by every write path that changes stock levels."""
+from fastapi import HTTPException
+from sqlalchemy import case, literal, select, update
+from sqlalchemy.orm import Session
+from decimal import Decimal
+from typing import Dict, Mapping
+import uuid
+
+from app.db.models.item import Item
+from app.api.counters import is_low, track_stock_levels
+from app.api.events import queue_event
+
+
+def apply_stock_deltas(
+    db: Session,
+    deltas: Mapping[uuid.UUID, Decimal],
+    locked: bool = False
+) -> Dict[uuid.UUID, object]:
+    """Add each delta to its item's ``current_stock_level`` inside the caller's transaction.
+
+    The increment happens in SQL (``SET level = level + delta``), so concurrent
+    writers never lose updates, and the WHERE clause refuses any result below
+    zero, so no prior read is needed to check availability. When more than one
+    item is touched, rows are locked in ascending id order first, which gives
+    every writer the same lock order and rules out deadlocks between them.
+    The lock is FOR NO KEY UPDATE, the same strength the UPDATE itself takes:
+    it does not conflict with the KEY SHARE locks that already-flushed
+    movement and line rows hold on their items, so concurrent writers that
+    share a hot item queue behind each other instead of deadlocking.
+    Pass ``locked=True`` when the caller has already locked these rows that
+    way in the current transaction.
+
+    Call this as the last statement before ``commit()`` so row locks on hot
+    items are held as briefly as possible. On failure an HTTPException
+    (404 missing, 400 insufficient) is raised and no stock level has changed;
+    rolling back the rest of the transaction is left to the caller.
+
+    Low-stock dashboard counters are adjusted for any item crossing its minimum,
+    and live events are queued for publication on commit.
+    Returns the updated rows (id, name, current_stock_level, minimum_stock_level,
+    archived_at) keyed by item id.
+    """
+    deltas = {item_id: Decimal(delta) for item_id, delta in deltas.items() if delta}
+    if not deltas:
+        return {}
+
+    ordered_ids = sorted(deltas)
+    if len(ordered_ids) > 1 and not locked:
+        db.execute(
+            select(Item.id).where(Item.id.in_(ordered_ids)).order_by(Item.id).with_for_update(key_share=True)
+        ).all()
+
+    delta_expr = case(
+        {item_id: literal(deltas[item_id], Item.current_stock_level.type) for item_id in ordered_ids},
+        value=Item.id
+    )
+    stmt = (
+        update(Item)
+        .where(Item.id.in_(ordered_ids), Item.current_stock_level + delta_expr >= 0)
+        .values(current_stock_level=Item.current_stock_level + delta_expr)
+        .returning(Item.id, Item.name, Item.current_stock_level, Item.minimum_stock_level, Item.archived_at)
+        .execution_options(synchronize_session=False)
+    )
+    updated = {row.id: row for row in db.execute(stmt)}
+
+    if len(updated) != len(deltas):
+        _raise_stock_error(db, [item_id for item_id in ordered_ids if item_id not in updated], deltas)
+
+    track_stock_levels(db, updated.values(), deltas)
+    _queue_stock_events(db, updated.values(), deltas)
+    return updated
+
+
+def _queue_stock_events(db: Session, rows, deltas: Mapping[uuid.UUID, Decimal]) -> None:
+    """Queue live "stock" events, plus "low_stock" for items crossing their minimum."""
+    for row in rows:
+        queue_event(db, "stock", {
+            "item_id": row.id,
+            "name": row.name,
+            "delta": deltas[row.id],
+            "current_stock_level": row.current_stock_level,
+        })
+        was_low = is_low(row.current_stock_level - deltas[row.id], row.minimum_stock_level)
+        now_low = is_low(row.current_stock_level, row.minimum_stock_level)
+        if row.archived_at is None and was_low != now_low:
+            queue_event(db, "low_stock", {
+                "item_id": row.id,
+                "name": row.name,
+                "low": now_low,
+                "current_stock_level": row.current_stock_level,
+                "minimum_stock_level": row.minimum_stock_level,
+            })
+
+
+def _raise_stock_error(db: Session, failed_ids, deltas: Mapping[uuid.UUID, Decimal]) -> None:
+    """Explain why the conditional update skipped some items."""
+    found = {item.id: item for item in db.query(Item).filter(Item.id.in_(failed_ids))}
+    missing = [str(item_id) for item_id in failed_ids if item_id not in found]
+    if missing:
+        detail = "Item not found" if len(failed_ids) == 1 else f"Items not found: {', '.join(missing)}"
+        raise HTTPException(status_code=404, detail=detail)
+
+    shortfalls = [
+        (found[item_id].name, found[item_id].current_stock_level, -deltas[item_id])
+        for item_id in failed_ids
+    ]
+    if len(shortfalls) == 1:
+        name, available, requested = shortfalls[0]
+        detail = f"Insufficient stock for {name}. Available: {available}, Requested: {requested}"
+    else:
+        detail = "Insufficient stock for " + "; ".join(
+            f"{name} (available {available}, requested {requested})" for name, available, requested in shortfalls
+        )
+    raise HTTPException(status_code=400, detail=detail)
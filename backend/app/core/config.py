@@ -21,6 +21,18 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     
+    # Dashboard counters: how often to recompute them from source tables (0 disables)
+    COUNTER_RECOMPUTE_INTERVAL_MINUTES: int = 60
+    
+    # Idempotency-Key replays: how long stored responses are kept
+    IDEMPOTENCY_KEY_TTL_HOURS: int = 24
+    
+    # Live events: relay through Postgres LISTEN/NOTIFY so all workers see them
+    EVENTS_PG_NOTIFY: bool = False
+    
+    # What-if simulation sessions: idle time before a session is discarded
+    SIMULATION_TTL_MINUTES: int = 30
+    
     # CORS
     ALLOWED_ORIGINS: list[str] = ["*"]
     
@@ -1,10 +1,16 @@
 """Database models."""
 from app.db.models.user import User, UserRole, RefreshToken
-from app.db.models.item import Item, ItemCategory, Category
+from app.db.models.item import Item, ItemCategory, Category, CategoryClosure
 from app.db.models.stock_movement import StockMovement, MovementType, ReferenceType
-from app.db.models.production import Production
-from app.db.models.operations import Purchase, Assembly, Distribution, DistributionType
+from app.db.models.production import Production, RecipeComponent
+from app.db.models.kit_template import KitTemplate, KitTemplateComponent
+from app.db.models.operations import (
+    Purchase, PurchaseLine, Assembly, Distribution, DistributionLine, DistributionType
+)
 from app.db.models.recipient import Recipient
+from app.db.models.counter import StatCounter
+from app.db.models.idempotency import IdempotencyKey
+from app.db.models.rollup import DailyItemFlow, DailyUserActivity
 
 __all__ = [
     "User",
@@ -13,13 +19,23 @@ __all__ = [
     "Item",
     "ItemCategory",
     "Category",
+    "CategoryClosure",
     "StockMovement",
     "MovementType",
     "ReferenceType",
     "Production",
+    "RecipeComponent",
+    "KitTemplate",
+    "KitTemplateComponent",
     "Purchase",
+    "PurchaseLine",
     "Assembly",
     "Distribution",
+    "DistributionLine",
     "DistributionType",
     "Recipient",
+    "StatCounter",
+    "IdempotencyKey",
+    "DailyItemFlow",
+    "DailyUserActivity",
 ]
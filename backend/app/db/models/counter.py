@@ -0,0 +1,20 @@
+"""Sharded counter model for incrementally maintained statistics."""
+from sqlalchemy import Column, String, SmallInteger, BigInteger
+
+from app.db.base import Base
+
+
+class StatCounter(Base):
+    """One shard of a named counter.
+    
+    A counter's value is the sum of its shards. Writers add to a random
+    shard so concurrent increments rarely wait on the same row.
+    Names are either scalar (e.g. "items.total") or per-day buckets
+    (e.g. "productions:2026-01-31").
+    """
+    
+    __tablename__ = "stat_counters"
+    
+    name = Column(String(100), primary_key=True)
+    shard = Column(SmallInteger, primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
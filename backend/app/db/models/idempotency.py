@@ -0,0 +1,29 @@
+"""Stored responses for Idempotency-Key replays."""
+from datetime import datetime
+
+from sqlalchemy import Column, String, DateTime, Integer, JSON, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.base import Base
+
+
+class IdempotencyKey(Base):
+    """Response of a write request, kept until ``expires_at`` for safe retries.
+    
+    Keys are scoped per user. The row is written in the same transaction
+    as the change it describes, so it exists exactly when the change does.
+    """
+    
+    __tablename__ = "idempotency_keys"
+    
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    
+    # Hash of method, path and body, to reject a key reused for another request
+    request_hash = Column(String(64), nullable=False)
+    
+    status_code = Column(Integer, nullable=True)
+    response_body = Column(JSON, nullable=True)
+    
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
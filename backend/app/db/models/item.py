@@ -3,7 +3,7 @@ from datetime import datetime
 import enum
 import uuid
 
-from sqlalchemy import Column, String, DateTime, Integer, Text, ForeignKey, Enum as SQLEnum, Numeric
+from sqlalchemy import Column, String, DateTime, Integer, Text, ForeignKey, Enum as SQLEnum, Numeric, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -32,16 +32,54 @@ class Category(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
 
+class CategoryClosure(Base):
+    """Closure table for the category tree.
+    
+    Holds one row per (ancestor, descendant) pair, including each category
+    paired with itself at depth 0, so whole subtrees resolve with one
+    indexed join instead of a recursive walk. Maintained by the category
+    routes on every create, move and delete.
+    """
+    
+    __tablename__ = "category_closure"
+    __table_args__ = (
+        Index("ix_category_closure_descendant", "descendant_id", "ancestor_id"),
+    )
+    
+    ancestor_id = Column(UUID(as_uuid=True), ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True)
+    descendant_id = Column(UUID(as_uuid=True), ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True)
+    depth = Column(Integer, nullable=False)
+
+
 class Item(Base):
     """Item model for inventory tracking."""
     
     __tablename__ = "items"
+    __table_args__ = (
+        # Keyset pagination order for list_items
+        Index("ix_items_name_id", "name", "id"),
+        # Partial indexes over active (non-archived) rows only, which is what
+        # list, count and dashboard queries read by default
+        Index(
+            "ix_items_active_name_id", "name", "id",
+            postgresql_where=text("archived_at IS NULL"), sqlite_where=text("archived_at IS NULL")
+        ),
+        Index(
+            "ix_items_active_category", "category",
+            postgresql_where=text("archived_at IS NULL"), sqlite_where=text("archived_at IS NULL")
+        ),
+        Index(
+            "ix_items_active_low_stock", "current_stock_level", "minimum_stock_level",
+            postgresql_where=text("archived_at IS NULL AND minimum_stock_level IS NOT NULL"),
+            sqlite_where=text("archived_at IS NULL AND minimum_stock_level IS NOT NULL")
+        ),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(255), nullable=False, index=True)
     description = Column(Text, nullable=True)
     category = Column(SQLEnum(ItemCategory), nullable=False, index=True)
-    category_id = Column(UUID(as_uuid=True), ForeignKey("categories.id"), nullable=True)
+    category_id = Column(UUID(as_uuid=True), ForeignKey("categories.id"), nullable=True, index=True)
     
     # Stock tracking
     unit_of_measure = Column(String(50), nullable=False)  # e.g., "kg", "liters", "units", "bags"
@@ -54,5 +92,8 @@ class Item(Base):
     unit_cost_thb = Column(Integer, nullable=True, index=True)
     notes = Column(Text, nullable=True)
     
+    # Set when a discontinued item is archived instead of deleted (keeps its history)
+    archived_at = Column(DateTime, nullable=True)
+    
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)
@@ -2,8 +2,9 @@
 from datetime import datetime
 import uuid
 
-from sqlalchemy import Column, String, DateTime, ForeignKey, Boolean, JSON, Text
+from sqlalchemy import Column, String, DateTime, ForeignKey, Boolean, Text, Integer, SmallInteger, Index
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
 
 from app.db.base import Base
 
@@ -26,9 +27,13 @@ class KitTemplate(Base):
     # The assembled kit item this template produces
     kit_item_id = Column(UUID(as_uuid=True), ForeignKey("items.id"), nullable=False)
     
-    # Bill of Materials: [{"item_id": "uuid", "quantity": 2, "item_name": "Soap"}, ...]
-    # item_name is denormalized for easy display
-    components = Column(JSON, nullable=False)
+    # Bill of Materials, one row per component item (loaded with the template in one extra query)
+    components = relationship(
+        "KitTemplateComponent",
+        order_by="KitTemplateComponent.position",
+        cascade="all, delete-orphan",
+        lazy="selectin"
+    )
     
     # Status
     is_active = Column(Boolean, default=True, nullable=False)
@@ -37,3 +42,20 @@ class KitTemplate(Base):
     created_by_user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+
+class KitTemplateComponent(Base):
+    """One component item of a kit template and the quantity needed per kit."""
+    
+    __tablename__ = "kit_template_components"
+    __table_args__ = (
+        # Reverse lookup: which templates use an item
+        Index("ix_kit_template_components_item_template", "item_id", "template_id"),
+    )
+    
+    template_id = Column(UUID(as_uuid=True), ForeignKey("kit_templates.id", ondelete="CASCADE"), primary_key=True)
+    item_id = Column(UUID(as_uuid=True), ForeignKey("items.id"), primary_key=True)
+    quantity = Column(Integer, nullable=False)
+    
+    # Display order within the template
+    position = Column(SmallInteger, nullable=False, default=0)
@@ -3,8 +3,9 @@ from datetime import datetime
 import enum
 import uuid
 
-from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Numeric, JSON, Enum as SQLEnum
+from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Numeric, JSON, SmallInteger, Index, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
 
 from app.db.base import Base
 
@@ -21,6 +22,8 @@ class Purchase(Base):
     
     # Items purchased (stored as JSON array of {item_id, quantity, unit_cost})
     items_purchased = Column(JSON, nullable=False)
+    # The same items as typed rows, for per-item queries
+    lines = relationship("PurchaseLine", cascade="all, delete-orphan", passive_deletes=True)
     
     total_cost = Column(Numeric(10, 2), nullable=True)
     
@@ -31,6 +34,22 @@ class Purchase(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
 
+class PurchaseLine(Base):
+    """One item of a purchase; purchase_date is copied from the purchase for (item, date) range scans."""
+    
+    __tablename__ = "purchase_lines"
+    __table_args__ = (
+        Index("ix_purchase_lines_item_date", "item_id", "purchase_date"),
+    )
+    
+    purchase_id = Column(UUID(as_uuid=True), ForeignKey("purchases.id", ondelete="CASCADE"), primary_key=True)
+    line_no = Column(SmallInteger, primary_key=True)
+    item_id = Column(UUID(as_uuid=True), ForeignKey("items.id"), nullable=False)
+    purchase_date = Column(DateTime, nullable=False)
+    quantity = Column(Numeric(10, 2), nullable=False)
+    unit_cost = Column(Numeric(10, 2), nullable=True)
+
+
 class Assembly(Base):
     """Assembly model for kit building events."""
     
@@ -74,6 +93,8 @@ class Distribution(Base):
     
     # Items distributed (stored as JSON array of {item_id, quantity})
     items_distributed = Column(JSON, nullable=False)
+    # The same items as typed rows, for per-item queries
+    lines = relationship("DistributionLine", cascade="all, delete-orphan", passive_deletes=True)
     
     recipient_info = Column(Text, nullable=True)  # Location, organization name, etc.
     
@@ -84,3 +105,18 @@ class Distribution(Base):
     # Stores original legacy distribution type (e.g. school_delivery) when mapped to a new simplified type
     distribution_type_legacy = Column(String(50), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class DistributionLine(Base):
+    """One item of a distribution; distribution_date is copied from the distribution for (item, date) range scans."""
+    
+    __tablename__ = "distribution_lines"
+    __table_args__ = (
+        Index("ix_distribution_lines_item_date", "item_id", "distribution_date"),
+    )
+    
+    distribution_id = Column(UUID(as_uuid=True), ForeignKey("distributions.id", ondelete="CASCADE"), primary_key=True)
+    line_no = Column(SmallInteger, primary_key=True)
+    item_id = Column(UUID(as_uuid=True), ForeignKey("items.id"), nullable=False)
+    distribution_date = Column(DateTime, nullable=False)
+    quantity = Column(Numeric(10, 2), nullable=False)
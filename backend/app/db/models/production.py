@@ -19,7 +19,7 @@ class Production(Base):
     produced_item_id = Column(UUID(as_uuid=True), ForeignKey("items.id"), nullable=False, index=True)
     quantity_produced = Column(Numeric(10, 2), nullable=False)
     
-    # Raw materials used (stored as JSON array of {item_id, quantity})
+    # Raw materials used (stored as JSON array of {item_id, item_name, quantity_per_unit, quantity})
     raw_materials_used = Column(JSON, nullable=True)
     
     # User who recorded the production
@@ -27,3 +27,13 @@ class Production(Base):
     
     notes = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class RecipeComponent(Base):
+    """Raw material consumed per unit of a produced item (bill of materials line)."""
+    
+    __tablename__ = "recipe_components"
+    
+    product_item_id = Column(UUID(as_uuid=True), ForeignKey("items.id", ondelete="CASCADE"), primary_key=True)
+    material_item_id = Column(UUID(as_uuid=True), ForeignKey("items.id"), primary_key=True, index=True)
+    quantity_per_unit = Column(Numeric(10, 4), nullable=False)
@@ -0,0 +1,42 @@
+"""Per-day rollups of stock movements and user activity for reports."""
+from sqlalchemy import Column, Date, Integer, Numeric, ForeignKey, Index, Enum as SQLEnum
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.base import Base
+from app.db.models.stock_movement import MovementType, ReferenceType
+
+
+class DailyItemFlow(Base):
+    """Total stock moved for one item on one day, by reference and movement type.
+    
+    The day is the date of the operation the movements belong to (e.g. a
+    backdated production counts on its production date); adjustments
+    count on the day they were made.
+    """
+    
+    __tablename__ = "daily_item_flow"
+    __table_args__ = (
+        Index("ix_daily_item_flow_item_day", "item_id", "day"),
+    )
+    
+    day = Column(Date, primary_key=True)
+    item_id = Column(UUID(as_uuid=True), ForeignKey("items.id"), primary_key=True)
+    reference_type = Column(SQLEnum(ReferenceType), primary_key=True)
+    movement_type = Column(SQLEnum(MovementType), primary_key=True)
+    quantity = Column(Numeric(14, 2), nullable=False, default=0)
+    movements = Column(Integer, nullable=False, default=0)
+
+
+class DailyUserActivity(Base):
+    """Number of operations one user recorded on one day, by operation kind.
+    
+    Kinds are production, purchase, distribution, assembly and adjustment
+    (each stock adjustment counts as one).
+    """
+    
+    __tablename__ = "daily_user_activity"
+    
+    day = Column(Date, primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    operation = Column(SQLEnum(ReferenceType), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
@@ -3,7 +3,7 @@ from datetime import datetime
 import enum
 import uuid
 
-from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Enum as SQLEnum, Numeric
+from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Enum as SQLEnum, Numeric, Index
 from sqlalchemy.dialects.postgresql import UUID
 
 from app.db.base import Base
@@ -29,6 +29,10 @@ class StockMovement(Base):
     """Stock movement model for tracking all inventory changes."""
     
     __tablename__ = "stock_movements"
+    __table_args__ = (
+        # Newest-first keyset order for the activity feed
+        Index("ix_stock_movements_created_at_id", "created_at", "id"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     item_id = Column(UUID(as_uuid=True), ForeignKey("items.id"), nullable=False, index=True)
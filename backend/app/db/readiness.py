@@ -0,0 +1,51 @@
+"""Schema readiness, checked once at startup and cached for the process.
+
+Request handlers rely on the schema being in place and never probe the
+catalog themselves; the cached result is reported by ``GET /ready``.
+"""
+from alembic.config import Config as AlembicConfig
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+from datetime import datetime
+from typing import Optional
+import os
+
+from app.db.base import Base
+import app.db.models  # noqa: F401 (registers every table on Base.metadata)
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+_status: Optional[dict] = None
+
+
+def check_schema(engine: Engine) -> dict:
+    """Compare the database with the models and the latest migration, and cache the result."""
+    global _status
+    status = {
+        "ready": False,
+        "checked_at": datetime.utcnow(),
+        "revision": None,
+        "head": None,
+        "missing_tables": [],
+        "error": None,
+    }
+    try:
+        cfg = AlembicConfig(os.path.join(BACKEND_DIR, "alembic.ini"))
+        cfg.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+        status["head"] = ScriptDirectory.from_config(cfg).get_current_head()
+        with engine.connect() as conn:
+            status["revision"] = MigrationContext.configure(conn).get_current_revision()
+            existing = set(inspect(conn).get_table_names())
+        status["missing_tables"] = sorted(set(Base.metadata.tables) - existing)
+        status["ready"] = not status["missing_tables"] and status["revision"] == status["head"]
+    except Exception as e:
+        status["error"] = str(e)
+    _status = status
+    return status
+
+
+def schema_status() -> Optional[dict]:
+    """The result of the startup check, or None if it has not run yet."""
+    return _status
@@ -1,9 +1,11 @@
 """Main FastAPI application."""
 from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
-from app.api.routes import auth, items, quick_entry, kit_assembly, reports, recipients
+from app.api.routes import auth, items, quick_entry, kit_assembly, reports, recipients, export, categories, events, recipes, simulations
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -18,12 +20,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "X-Total-Count", "Idempotent-Replayed"],
 )
 
 # Auto-run Alembic migrations on startup (idempotent)
 from alembic.config import Config as AlembicConfig
 from alembic import command as alembic_command
+import logging
 import os
+import threading
+import time
+
+from app.db.session import SessionLocal, engine
+from app.api.counters import recompute_counters
+from app.api.idempotency import purge_expired_keys
+from app.api.events import start_pg_listener
+from app.db.readiness import check_schema, schema_status
+
+logger = logging.getLogger(__name__)
 
 @app.on_event("startup")
 def run_migrations() -> None:
@@ -38,13 +52,80 @@ def run_migrations() -> None:
         # Avoid blocking app startup; errors will surface on API use
         pass
 
+@app.on_event("startup")
+def check_schema_ready() -> None:
+    """Check once, after migrations, that every table exists at the latest revision."""
+    check_schema(engine)
+
+def _run_periodically(name: str, interval_minutes: int, job) -> None:
+    """Run job(db) now and then every interval in a daemon thread, committing each run."""
+    def loop() -> None:
+        while True:
+            db = SessionLocal()
+            try:
+                job(db)
+                db.commit()
+            except Exception:
+                # Keep the loop alive; retry next interval
+                logger.exception("%s failed", name)
+                try:
+                    db.rollback()
+                except Exception:
+                    logger.exception("%s rollback failed", name)
+            finally:
+                try:
+                    db.close()
+                except Exception:
+                    logger.exception("%s could not close its session", name)
+            time.sleep(interval_minutes * 60)
+
+    threading.Thread(target=loop, name=name, daemon=True).start()
+
+@app.on_event("startup")
+def start_counter_recompute() -> None:
+    """Rebuild dashboard counters now and then periodically, healing any drift."""
+    if settings.COUNTER_RECOMPUTE_INTERVAL_MINUTES > 0:
+        _run_periodically("counter-recompute", settings.COUNTER_RECOMPUTE_INTERVAL_MINUTES, recompute_counters)
+
+@app.on_event("startup")
+def start_idempotency_purge() -> None:
+    """Delete expired Idempotency-Key responses every hour."""
+    _run_periodically("idempotency-purge", 60, purge_expired_keys)
+
+@app.on_event("startup")
+def start_event_listener() -> None:
+    """Relay live events committed by other workers (Postgres LISTEN/NOTIFY)."""
+    if settings.EVENTS_PG_NOTIFY:
+        start_pg_listener(engine)
+
 # Include routers
 app.include_router(auth.router, prefix=f"{settings.API_PREFIX}/auth", tags=["Authentication"])
 app.include_router(items.router, prefix=f"{settings.API_PREFIX}/items", tags=["Items"])
+app.include_router(categories.router, prefix=f"{settings.API_PREFIX}/categories", tags=["Categories"])
 app.include_router(kit_assembly.router, prefix=f"{settings.API_PREFIX}/kits", tags=["Kit Assembly"])
+app.include_router(recipes.router, prefix=f"{settings.API_PREFIX}/recipes", tags=["Recipes"])
+app.include_router(simulations.router, prefix=f"{settings.API_PREFIX}/simulations", tags=["Simulations"])
 app.include_router(quick_entry.router, prefix=f"{settings.API_PREFIX}/quick", tags=["Quick Entry"])
 app.include_router(reports.router, prefix=f"{settings.API_PREFIX}/reports", tags=["Reports"])
 app.include_router(recipients.router, prefix=f"{settings.API_PREFIX}/recipients", tags=["Recipients"])
+app.include_router(export.router, prefix=f"{settings.API_PREFIX}/export", tags=["Export"])
+app.include_router(events.router, prefix=f"{settings.API_PREFIX}/events", tags=["Events"])
+
+# Probes are declared before the SPA catch-all route so it cannot shadow them
+@app.get("/health")
+def health_check():
+    """Health check endpoint."""
+    return {"status": "healthy"}
+
+
+@app.get("/ready")
+def readiness_check():
+    """Readiness endpoint: 503 until the startup schema check has passed."""
+    status = schema_status()
+    if status is None:
+        return JSONResponse(status_code=503, content={"ready": False, "error": "Schema check has not run"})
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=jsonable_encoder(status))
+
 
 # Serve frontend static files in production
 from app.static_files import mount_static_files
@@ -59,9 +140,3 @@ def root():
         "version": settings.VERSION,
         "status": "running"
     }
-
-
-@app.get("/health")
-def health_check():
-    """Health check endpoint."""
-    return {"status": "healthy"}
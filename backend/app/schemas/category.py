@@ -0,0 +1,38 @@
+"""Category hierarchy schemas."""
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+from decimal import Decimal
+import uuid
+
+
+class CategoryCreate(BaseModel):
+    name: str = Field(min_length=1, max_length=255)
+    parent_id: Optional[uuid.UUID] = None
+
+
+class CategoryUpdate(BaseModel):
+    """Rename and/or move a category; send parent_id=null to make it a root."""
+    name: Optional[str] = Field(default=None, min_length=1, max_length=255)
+    parent_id: Optional[uuid.UUID] = None
+
+
+class CategoryResponse(BaseModel):
+    id: uuid.UUID
+    name: str
+    parent_id: Optional[uuid.UUID] = None
+    depth: int = 0  # 0 for root categories
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class CategoryRollup(BaseModel):
+    """Stock totals for a category and everything beneath it."""
+    category_id: uuid.UUID
+    name: str
+    item_count: int
+    total_stock: Decimal
+    total_value_thb: Decimal  # sum of current_stock_level * unit_cost_thb
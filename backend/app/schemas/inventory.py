@@ -1,6 +1,6 @@
 """Inventory and operations schemas."""
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, Field, validator
+from typing import Annotated, Optional, List, Literal, Union
 from datetime import datetime
 from decimal import Decimal
 import uuid
@@ -15,6 +15,7 @@ class ItemBase(BaseModel):
     name: str
     description: Optional[str] = None
     category: ItemCategory
+    category_id: Optional[uuid.UUID] = None
     unit_of_measure: str
     minimum_stock_level: Optional[Decimal] = None
     sku: Optional[str] = None
@@ -32,6 +33,7 @@ class ItemUpdate(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
     category: Optional[ItemCategory] = None
+    category_id: Optional[uuid.UUID] = None
     unit_of_measure: Optional[str] = None
     minimum_stock_level: Optional[Decimal] = None
     sku: Optional[str] = None
@@ -43,6 +45,7 @@ class ItemResponse(ItemBase):
     """Item response schema."""
     id: uuid.UUID
     current_stock_level: Decimal
+    archived_at: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
     
@@ -50,6 +53,27 @@ class ItemResponse(ItemBase):
         from_attributes = True
 
 
+class ItemSearchResult(ItemResponse):
+    """Item search hit with its relevance score (higher is better)."""
+    score: float
+
+
+class ItemImportError(BaseModel):
+    """A row rejected by the bulk import."""
+    row: int  # 1-based record number in the upload
+    sku: Optional[str] = None
+    error: str
+
+
+class ItemImportResult(BaseModel):
+    """Outcome of a bulk item import."""
+    total_rows: int
+    imported: int
+    failed: int
+    errors: List[ItemImportError]
+    errors_truncated: bool = False
+
+
 # Quick Entry Schemas for Dashboard
 class QuickProductionEntry(BaseModel):
     """Quick entry for recording production (dashboard)."""
@@ -57,6 +81,8 @@ class QuickProductionEntry(BaseModel):
     quantity_produced: Decimal
     production_date: Optional[datetime] = None
     notes: Optional[str] = None
+    # Deduct raw materials per the item's recipe (if it has one)
+    consume_materials: bool = True
 
 
 class QuickPurchaseItem(BaseModel):
@@ -89,12 +115,95 @@ class QuickDistributionEntry(BaseModel):
     notes: Optional[str] = None
 
 
+# Offline sync: quick entries recorded on a device and replayed in one batch
+class SyncProductionEntry(QuickProductionEntry):
+    """Production entry in a sync batch."""
+    type: Literal["production"]
+    client_id: str = Field(min_length=1, max_length=100)
+
+
+class SyncPurchaseEntry(QuickPurchaseEntry):
+    """Purchase entry in a sync batch."""
+    type: Literal["purchase"]
+    client_id: str = Field(min_length=1, max_length=100)
+
+
+class SyncDistributionEntry(QuickDistributionEntry):
+    """Distribution entry in a sync batch."""
+    type: Literal["distribution"]
+    client_id: str = Field(min_length=1, max_length=100)
+
+
+SyncEntry = Annotated[
+    Union[SyncProductionEntry, SyncPurchaseEntry, SyncDistributionEntry],
+    Field(discriminator="type")
+]
+
+
+class QuickSyncRequest(BaseModel):
+    """Ordered batch of quick entries; each is applied or rejected on its own."""
+    entries: List[SyncEntry] = Field(min_length=1, max_length=500)
+    
+    @validator('entries')
+    def client_ids_must_be_unique(cls, v):
+        client_ids = [e.client_id for e in v]
+        if len(client_ids) != len(set(client_ids)):
+            raise ValueError('Each client_id may appear only once per batch')
+        return v
+
+
 # Adjustment Schema
 class StockAdjustmentRequest(BaseModel):
     delta: Decimal = Field(description="Positive to add, negative to subtract")
     reason: Optional[str] = Field(default=None, max_length=200)
 
 
+class StockAdjustmentBatchEntry(StockAdjustmentRequest):
+    """One item's adjustment within a batch."""
+    item_id: uuid.UUID
+
+
+class StockAdjustmentBatchRequest(BaseModel):
+    """Apply several stock adjustments atomically (e.g. a stocktake correction)."""
+    adjustments: List[StockAdjustmentBatchEntry] = Field(min_length=1, max_length=1000)
+    
+    @validator('adjustments')
+    def items_must_be_unique(cls, v):
+        item_ids = [a.item_id for a in v]
+        if len(item_ids) != len(set(item_ids)):
+            raise ValueError('Each item may appear only once per batch')
+        return v
+
+
+class StockAdjustmentResult(BaseModel):
+    """Resulting stock level for one adjusted item."""
+    item_id: uuid.UUID
+    name: str
+    delta: Decimal
+    new_stock_level: Decimal
+
+
+class StockAdjustmentBatchResponse(BaseModel):
+    """Per-item results of a batch adjustment."""
+    results: List[StockAdjustmentResult]
+
+
+class SyncEntryResult(BaseModel):
+    """Outcome of one sync entry."""
+    client_id: str
+    type: str
+    status: Literal["applied", "rejected"]
+    id: Optional[uuid.UUID] = None
+    error: Optional[str] = None
+
+
+class QuickSyncResponse(BaseModel):
+    """Per-entry results of a sync batch, in request order."""
+    applied: int
+    rejected: int
+    results: List[SyncEntryResult]
+
+
 # Response Schemas
 class ProductionResponse(BaseModel):
     """Production response schema."""
@@ -102,7 +211,7 @@ class ProductionResponse(BaseModel):
     production_date: datetime
     produced_item_id: uuid.UUID
     quantity_produced: Decimal
-    raw_materials_used: Optional[dict] = None
+    raw_materials_used: Optional[List[dict]] = None
     notes: Optional[str] = None
     created_at: datetime
     
@@ -138,10 +247,23 @@ class DistributionResponse(BaseModel):
         from_attributes = True
 
 
+class ActivityEntry(BaseModel):
+    """One stock movement in the activity feed."""
+    id: uuid.UUID
+    type: str
+    item_name: str
+    quantity: float
+    movement_type: str
+    timestamp: str
+    user_name: str
+    recipient_info: Optional[str] = None
+    notes: Optional[str] = None
+
+
 class DashboardStats(BaseModel):
     """Dashboard statistics."""
     total_items: int
     low_stock_items: int
     productions_this_week: int
     distributions_this_week: int
-    recent_activity: List[dict]
+    recent_activity: List[ActivityEntry]
@@ -85,6 +85,11 @@ class AssembleKitRequest(BaseModel):
         return v
 
 
+class AssembleBatchRequest(BaseModel):
+    """Assemble several templates together; all succeed or none do."""
+    assemblies: List[AssembleKitRequest] = Field(min_items=1, max_items=100)
+
+
 class ComponentAvailability(BaseModel):
     """Component stock availability check."""
     item_id: uuid.UUID
@@ -117,3 +122,70 @@ class AssemblyResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class KitCapacity(BaseModel):
+    """How many kits current stock allows for one template, on its own."""
+    template_id: uuid.UUID
+    template_name: str
+    kit_item_id: uuid.UUID
+    kit_item_name: str
+    max_kits: int
+    limiting_item_id: Optional[str] = None  # component that runs out first
+    limiting_item_name: Optional[str] = None
+    limiting_available: Optional[float] = None
+    limiting_per_kit: Optional[int] = None
+
+
+class KitPlanTarget(BaseModel):
+    """One template to include in an assembly plan."""
+    kit_template_id: uuid.UUID
+    target: Optional[int] = Field(None, ge=0, le=100000, description="Most kits wanted; omit for as many as possible")
+    weight: float = Field(1.0, gt=0, description="Priority: value of one kit of this template")
+
+
+class KitPlanRequest(BaseModel):
+    """Templates competing for the same stock."""
+    templates: List[KitPlanTarget] = Field(min_length=1, max_length=500)
+    
+    @validator('templates')
+    def templates_must_be_unique(cls, v):
+        template_ids = [t.kit_template_id for t in v]
+        if len(template_ids) != len(set(template_ids)):
+            raise ValueError('Each template may appear only once per plan')
+        return v
+
+
+class KitPlanAllocation(BaseModel):
+    """Planned kits for one template."""
+    kit_template_id: uuid.UUID
+    template_name: str
+    target: Optional[int]
+    weight: float
+    planned: int
+    unmet: Optional[int] = None  # target - planned, when a target was given
+
+
+class KitPlanComponent(BaseModel):
+    """Stock use for one component under the plan."""
+    item_id: str
+    item_name: str
+    available: float
+    used: int
+    remaining: float
+    required_for_targets: int  # units needed to meet every target (planned kits where no target)
+    shortfall: float  # how much more stock the targets would need
+
+
+class KitPlanResponse(BaseModel):
+    """Feasible assembly mix maximizing weighted kits from current stock."""
+    allocations: List[KitPlanAllocation]
+    total_kits: int
+    total_weight: float
+    components: List[KitPlanComponent]
+
+
+class AssembleBatchResponse(BaseModel):
+    """Result of a batch assembly, one entry per requested assembly in order."""
+    assemblies: List[AssemblyResponse]
+    total_kits: int
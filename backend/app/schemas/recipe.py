@@ -0,0 +1,36 @@
+"""Production recipe (bill of materials) schemas."""
+from pydantic import BaseModel, Field, validator
+from typing import List
+from decimal import Decimal
+import uuid
+
+
+class RecipeComponentIn(BaseModel):
+    material_item_id: uuid.UUID
+    quantity_per_unit: Decimal = Field(gt=0)
+
+
+class RecipeUpdate(BaseModel):
+    """Replace an item's recipe; an empty list removes it."""
+    components: List[RecipeComponentIn] = Field(max_length=200)
+
+    @validator('components')
+    def materials_must_be_unique(cls, v):
+        material_ids = [c.material_item_id for c in v]
+        if len(material_ids) != len(set(material_ids)):
+            raise ValueError('Each material may appear only once per recipe')
+        return v
+
+
+class RecipeComponentResponse(BaseModel):
+    material_item_id: uuid.UUID
+    material_name: str
+    unit_of_measure: str
+    quantity_per_unit: Decimal
+
+
+class RecipeResponse(BaseModel):
+    """Raw materials consumed per unit of a produced item."""
+    product_item_id: uuid.UUID
+    product_name: str
+    components: List[RecipeComponentResponse]
@@ -0,0 +1,76 @@
+"""What-if simulation schemas."""
+from pydantic import BaseModel
+from typing import List, Literal, Optional, Union
+from datetime import datetime
+from decimal import Decimal
+import uuid
+
+from app.schemas.inventory import QuickPurchaseEntry, QuickDistributionEntry
+from app.schemas.kit_assembly import AssembleKitRequest
+
+
+class SimulationAssemblyStep(AssembleKitRequest):
+    """Hypothetical kit assembly."""
+    type: Literal["assembly"]
+
+
+class SimulationPurchaseStep(QuickPurchaseEntry):
+    """Hypothetical purchase."""
+    type: Literal["purchase"]
+
+
+class SimulationDistributionStep(QuickDistributionEntry):
+    """Hypothetical distribution."""
+    type: Literal["distribution"]
+
+
+# Request bodies discriminate on "type" (see Body(discriminator=...) in the route)
+SimulationStep = Union[SimulationAssemblyStep, SimulationPurchaseStep, SimulationDistributionStep]
+
+
+class SimulationLevel(BaseModel):
+    """Projected stock of one item touched by a step."""
+    item_id: uuid.UUID
+    item_name: str
+    before: Decimal
+    after: Decimal
+    low: bool  # at or below its minimum after the step
+
+
+class SimulationShortfall(BaseModel):
+    """Item the step would take below zero (or that does not exist)."""
+    item_id: uuid.UUID
+    item_name: str
+    required: Decimal
+    available: Decimal
+
+
+class SimulationStepResult(BaseModel):
+    """Outcome of one step; rejected steps leave the projected stock unchanged."""
+    index: int
+    type: str
+    accepted: bool
+    levels: List[SimulationLevel]
+    shortfalls: List[SimulationShortfall]
+    error: Optional[str] = None
+
+
+class SimulationResponse(BaseModel):
+    """A simulation session and the steps run in it so far."""
+    id: uuid.UUID
+    snapshot_at: datetime
+    expires_at: datetime
+    steps: List[SimulationStepResult]
+
+
+class SimulationCommitted(BaseModel):
+    """Operation created from an accepted step."""
+    index: int
+    type: str
+    id: uuid.UUID
+
+
+class SimulationCommitResponse(BaseModel):
+    """Accepted steps applied for real, in order."""
+    applied: int
+    operations: List[SimulationCommitted]
@@ -0,0 +1,147 @@
+"""Contention benchmark: many concurrent writers against hot items.
+
+Runs N writer threads that each apply small stock deltas to the same items
+and reports throughput and whether any updates were lost. Compares the
+atomic stock layer (app.api.stock.apply_stock_deltas) with the old
+read-modify-write pattern.
+
+With ``--items`` above 1 every write is shaped like a distribution: one
+movement row per item is flushed first (taking KEY SHARE locks on the items
+through the foreign key), then the stock of all the items is changed
+together. Deadlocks aborted by the database are counted separately.
+
+Usage (from backend/, against the database in DATABASE_URL):
+
+    python -m scripts.bench_stock_contention --writers 50 --ops 40
+    python -m scripts.bench_stock_contention --items 5
+    python -m scripts.bench_stock_contention --mode legacy
+
+The benchmark creates and then deletes its own temporary items and user.
+"""
+import argparse
+import random
+import threading
+import time
+import uuid
+from decimal import Decimal
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db.models.item import Item, ItemCategory
+from app.db.models.user import User
+from app.db.models.stock_movement import StockMovement, MovementType, ReferenceType
+from app.api.stock import apply_stock_deltas
+
+
+def _add_movements(db, item_ids, user_id, delta):
+    # Random order, as a distribution's lines would be
+    for item_id in random.sample(item_ids, len(item_ids)):
+        db.add(StockMovement(
+            item_id=item_id,
+            movement_type=MovementType.OUT,
+            quantity=-delta,
+            reference_type=ReferenceType.DISTRIBUTION,
+            user_id=user_id,
+        ))
+    db.flush()
+
+
+def _atomic_write(db, item_ids, user_id, delta):
+    if len(item_ids) > 1:
+        _add_movements(db, item_ids, user_id, delta)
+    apply_stock_deltas(db, {item_id: delta for item_id in item_ids})
+    db.commit()
+
+
+def _legacy_write(db, item_ids, user_id, delta):
+    # The pattern the routes used before: read in Python, write back
+    if len(item_ids) > 1:
+        _add_movements(db, item_ids, user_id, delta)
+    for item_id in item_ids:
+        item = db.query(Item).filter(Item.id == item_id).first()
+        item.current_stock_level = item.current_stock_level + delta
+    db.commit()
+
+
+def run(mode: str, writers: int, ops: int, items: int) -> None:
+    engine = create_engine(settings.DATABASE_URL, pool_size=writers, max_overflow=0, pool_pre_ping=True)
+    Session = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    write = _atomic_write if mode == "atomic" else _legacy_write
+
+    start_level = Decimal(writers * ops)
+    with Session() as db:
+        suffix = uuid.uuid4().hex[:8]
+        user = User(
+            username=f"__contention_benchmark_{suffix}__",
+            email=f"contention-benchmark-{suffix}@example.invalid",
+            password_hash="!",
+        )
+        rows = [
+            Item(
+                name=f"__contention_benchmark_{n}__",
+                category=ItemCategory.RAW_MATERIAL,
+                unit_of_measure="units",
+                current_stock_level=start_level,
+            )
+            for n in range(items)
+        ]
+        db.add(user)
+        db.add_all(rows)
+        db.commit()
+        user_id = user.id
+        item_ids = [item.id for item in rows]
+
+    errors = []
+    barrier = threading.Barrier(writers)
+
+    def writer():
+        db = Session()
+        try:
+            barrier.wait()
+            for _ in range(ops):
+                try:
+                    write(db, item_ids, user_id, Decimal("-1"))
+                except Exception as e:  # keep going; report at the end
+                    db.rollback()
+                    errors.append(e)
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=writer) for _ in range(writers)]
+    began = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - began
+
+    with Session() as db:
+        final_levels = [
+            level for (level,) in db.query(Item.current_stock_level).filter(Item.id.in_(item_ids))
+        ]
+        db.query(StockMovement).filter(StockMovement.user_id == user_id).delete()
+        db.query(Item).filter(Item.id.in_(item_ids)).delete()
+        db.query(User).filter(User.id == user_id).delete()
+        db.commit()
+    engine.dispose()
+
+    deadlocks = sum(1 for e in errors if "deadlock" in str(e).lower())
+    committed = writers * ops - len(errors)
+    expected = start_level - committed
+    lost = sum(level - expected for level in final_levels)
+    print(f"mode={mode} writers={writers} ops/writer={ops} items/write={items}")
+    print(f"  committed writes : {committed} in {elapsed:.2f}s ({committed / elapsed:.0f} writes/s)")
+    print(f"  failed writes    : {len(errors)} ({deadlocks} deadlocks)")
+    print(f"  final stock      : {', '.join(map(str, final_levels))} (expected {expected}, lost updates: {lost})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=["atomic", "legacy"], default="atomic")
+    parser.add_argument("--writers", type=int, default=50)
+    parser.add_argument("--ops", type=int, default=40, help="writes per writer")
+    parser.add_argument("--items", type=int, default=1, help="hot items touched by every write")
+    args = parser.parse_args()
+    run(args.mode, args.writers, args.ops, args.items)
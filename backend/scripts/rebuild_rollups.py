@@ -0,0 +1,29 @@
+"""Rebuild the daily report rollups from the source tables.
+
+Write paths keep daily_item_flow and daily_user_activity up to date; run
+this to backfill history, or after bulk edits made directly in the
+database.
+
+Usage (from backend/):
+
+    python -m scripts.rebuild_rollups [--since YYYY-MM-DD]
+"""
+import argparse
+from datetime import date
+
+from app.db.session import SessionLocal
+from app.api.rollups import rebuild_rollups
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--since", type=date.fromisoformat, default=None, help="first day to rebuild (default: all history)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        rebuild_rollups(db, since=args.since)
+        db.commit()
+    finally:
+        db.close()
+    print("Rollups rebuilt")
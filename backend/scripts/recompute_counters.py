@@ -0,0 +1,28 @@
+"""Rebuild dashboard counters from the source tables.
+
+The API already does this on startup and every
+COUNTER_RECOMPUTE_INTERVAL_MINUTES; use this from cron when that loop is
+disabled, or after bulk edits made directly in the database.
+
+Usage (from backend/):
+
+    python -m scripts.recompute_counters [--days 8]
+"""
+import argparse
+
+from app.db.session import SessionLocal
+from app.api.counters import recompute_counters, RECOMPUTE_DAYS
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=RECOMPUTE_DAYS, help="per-day buckets to rebuild")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        recompute_counters(db, days=args.days)
+        db.commit()
+    finally:
+        db.close()
+    print("Counters recomputed")
@@ -9,6 +9,7 @@ import type {
   QuickPurchaseEntry,
   QuickDistributionEntry,
   DashboardStats,
+  LiveEvent,
   Recipient,
 } from '../types';
 
@@ -156,17 +157,61 @@ export const quickEntryAPI = {
   },
 };
 
+// Live events (Server-Sent Events). EventSource cannot send the bearer token,
+// so the stream is read with fetch. Reconnects until the returned function is called.
+export const subscribeEvents = (onEvent: (event: LiveEvent) => void): (() => void) => {
+  const controller = new AbortController();
+
+  const connect = async () => {
+    while (!controller.signal.aborted) {
+      try {
+        const token = localStorage.getItem('access_token');
+        const response = await fetch(`${API_BASE_URL}/events`, {
+          headers: token ? { Authorization: `Bearer ${token}` } : {},
+          signal: controller.signal,
+        });
+        if (!response.ok || !response.body) throw new Error(`Event stream failed: ${response.status}`);
+
+        const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+        let buffer = '';
+        for (;;) {
+          const { value, done } = await reader.read();
+          if (done) break;
+          buffer += value;
+          const blocks = buffer.split('\n\n');
+          buffer = blocks.pop() ?? '';
+          for (const block of blocks) {
+            let type = '';
+            let data = '';
+            for (const line of block.split('\n')) {
+              if (line.startsWith('event: ')) type = line.slice(7);
+              else if (line.startsWith('data: ')) data += line.slice(6);
+            }
+            if (type && data) onEvent({ type, data: JSON.parse(data) } as LiveEvent);
+          }
+        }
+      } catch {
+        if (controller.signal.aborted) return;
+      }
+      await new Promise((resolve) => setTimeout(resolve, 5000));
+    }
+  };
+
+  connect();
+  return () => controller.abort();
+};
+
 // Reports API
 import type { ComprehensiveReport } from '../types';
 
 export const reportsAPI = {
   getActivityReport: async (period: 'day' | 'week' | 'month'): Promise<ComprehensiveReport> => {
-    const response = await apiClient.get<ComprehensiveReport>(`/reports/activity?period=${period}`);
+    const response = await apiClient.get<ComprehensiveReport>(`/reports/activity?period=${period}&include=all`);
     return response.data;
   },
   getActivityReportCustom: async (startDate: string, endDate: string): Promise<ComprehensiveReport> => {
     const response = await apiClient.get<ComprehensiveReport>(
-      `/reports/activity?start_date=${startDate}T00:00:00Z&end_date=${endDate}T23:59:59Z`
+      `/reports/activity?start_date=${startDate}T00:00:00Z&end_date=${endDate}T23:59:59Z&include=all`
     );
     return response.data;
   },
@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react';
-import { quickEntryAPI, itemsAPI, recipientsAPI } from '../api/client';
+import { quickEntryAPI, itemsAPI, recipientsAPI, subscribeEvents } from '../api/client';
 import Walkthrough from '../components/Walkthrough';
 import type {
   DashboardStats,
@@ -34,6 +34,26 @@ export default function Dashboard() {
     loadData();
   }, []);
 
+  // Refresh stats when the server reports committed changes, instead of polling.
+  // Bursts of events (e.g. an offline sync) collapse into one refresh.
+  useEffect(() => {
+    let timer: ReturnType<typeof setTimeout> | undefined;
+    const unsubscribe = subscribeEvents(() => {
+      clearTimeout(timer);
+      timer = setTimeout(async () => {
+        try {
+          setStats(await quickEntryAPI.getDashboardStats());
+        } catch (error) {
+          console.error('Failed to refresh dashboard stats:', error);
+        }
+      }, 1000);
+    });
+    return () => {
+      clearTimeout(timer);
+      unsubscribe();
+    };
+  }, []);
+
   const loadData = async () => {
     try {
       const [statsData, itemsData, recipientsData] = await Promise.all([
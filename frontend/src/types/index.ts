@@ -127,6 +127,11 @@ export interface DashboardStats {
   recent_activity: RecentActivity[];
 }
 
+export interface LiveEvent {
+  type: 'stock' | 'low_stock' | 'operation';
+  data: Record<string, unknown>;
+}
+
 export interface RecentActivity {
   type: string;
   item_name: string;